@@ -0,0 +1,193 @@
+"""Time snapshot rendering for a synthetic universe.
+
+usage: python3 bench/bench_render.py [SYMBOLS] [REPEATS]
+
+Renders every output mode to /dev/null through the CLI's stdout path and
+prints the best-of-REPEATS time per mode, next to the per-line print()
+renderers the buffered path replaced and the speedup over them. Each mode's
+output is checked byte for byte against its reference first.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import html
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "snapshot"))
+
+import synthdesk_snapshot  # noqa: E402
+
+
+def synthetic_entries(count: int) -> list[Dict[str, Any]]:
+    entries = []
+    for index in range(count):
+        entries.append(
+            {
+                "symbol": f"SYM{index:05d}",
+                "regime": ("trend", "chop", "breakout")[index % 3],
+                "regime_ts": f"2025-12-22T10:{index % 60:02d}:00Z",
+                "change_value": f"chop -> trend @ 2025-12-22T09:{index % 60:02d}:00Z",
+                "direction": ("long", "short", "flat")[index % 3],
+                "size_pct": index % 100 / 10,
+                "risk_cap": 0.02,
+                "rationale": [f"signal {index} crossed", "volume <confirmed>"] if index % 2 else None,
+            }
+        )
+    return entries
+
+
+# The renderers as they were before output was buffered: one print() per line.
+
+
+def reference_markdown(header_ts: str, entries: list[Dict[str, Any]]) -> None:
+    print(f"# synthdesk snapshot (utc): {header_ts}")
+    print("")
+    for entry in entries:
+        print(f"## {entry['symbol']}")
+        print("")
+        print(f"- **regime:** {entry['regime']} @ {entry['regime_ts']}")
+        print(f"- **last regime change:** {entry['change_value']}")
+        print(
+            f"- **posture:** {entry['direction']} / {entry['risk_cap']} / size={entry['size_pct']}"
+        )
+        print("")
+        print("**rationale:**")
+        rationale = entry.get("rationale")
+        if isinstance(rationale, list) and rationale:
+            for line in rationale:
+                print(f"- {line}")
+        else:
+            print("- —")
+        print("")
+
+
+def reference_terminal(header_ts: str, entries: list[Dict[str, Any]]) -> None:
+    print(f"synthdesk snapshot (utc): {header_ts}")
+    print("")
+    for entry in entries:
+        print(entry["symbol"])
+        print(f"regime: {entry['regime']} @ {entry['regime_ts']}")
+        print(f"last regime change: {entry['change_value']}")
+        print(
+            f"posture: {entry['direction']} / {entry['risk_cap']} / size={entry['size_pct']}"
+        )
+        print("rationale:")
+        rationale = entry.get("rationale")
+        if isinstance(rationale, list) and rationale:
+            for line in rationale:
+                print(f"- {line}")
+        else:
+            print("- —")
+        print("")
+
+
+def reference_html(header_ts: str, entries: list[Dict[str, Any]]) -> None:
+    def _escape(value: Any) -> str:
+        return html.escape(str(value), quote=True)
+
+    print("<!doctype html>")
+    print('<html lang="en">')
+    print("<head>")
+    print('  <meta charset="utf-8">')
+    print("  <title>synthdesk snapshot</title>")
+    print("</head>")
+    print("<body>")
+    print(f"  <h1>synthdesk snapshot (utc): {_escape(header_ts)}</h1>")
+    print("")
+    for entry in entries:
+        print("  <section>")
+        print(f"    <h2>{_escape(entry['symbol'])}</h2>")
+        print("    <ul>")
+        print(
+            f"      <li><strong>regime:</strong> {_escape(entry['regime'])} @ "
+            f"{_escape(entry['regime_ts'])}</li>"
+        )
+        print(f"      <li><strong>last regime change:</strong> {_escape(entry['change_value'])}</li>")
+        print(
+            f"      <li><strong>posture:</strong> {_escape(entry['direction'])} / "
+            f"{_escape(entry['risk_cap'])} / size={_escape(entry['size_pct'])}</li>"
+        )
+        print("    </ul>")
+        print("")
+        print("    <strong>rationale:</strong>")
+        print("    <ul>")
+        rationale = entry.get("rationale")
+        if isinstance(rationale, list) and rationale:
+            for line in rationale:
+                print(f"      <li>{_escape(line)}</li>")
+        else:
+            print("      <li>—</li>")
+        print("    </ul>")
+        print("  </section>")
+    print("</body>")
+    print("</html>")
+
+
+# json postdates the buffered renderers, so it has no per-line reference.
+REFERENCES: Dict[str, Callable[[str, list[Dict[str, Any]]], None] | None] = {
+    "terminal": reference_terminal,
+    "markdown": reference_markdown,
+    "html": reference_html,
+    "json": None,
+}
+
+
+def captured(render: Callable[[], None]) -> bytes:
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        render()
+    return buffer.getvalue().encode("utf-8")
+
+
+def best_of(repeats: int, sink: Any, render: Callable[[], None]) -> float:
+    stdout = sys.stdout
+    best = float("inf")
+    for _ in range(repeats):
+        sys.stdout = sink
+        try:
+            started = time.perf_counter()
+            render()
+            sys.stdout.flush()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            sys.stdout = stdout
+    return best
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    entries = synthetic_entries(count)
+    header_ts = "2025-12-22T00:00:00Z"
+    with open(os.devnull, "w", encoding="utf-8") as sink:
+        for output_mode, reference in REFERENCES.items():
+
+            def buffered() -> None:
+                synthdesk_snapshot._render(output_mode, header_ts, entries)
+
+            if reference is None:
+                elapsed = best_of(repeats, sink, buffered)
+                print(f"{output_mode:<9} {count} symbols: {elapsed * 1000:8.2f} ms")
+                continue
+
+            def per_line() -> None:
+                reference(header_ts, entries)
+
+            if captured(buffered) != captured(per_line):
+                raise SystemExit(f"{output_mode}: buffered output differs from the per-line reference")
+            elapsed = best_of(repeats, sink, buffered)
+            baseline = best_of(repeats, sink, per_line)
+            print(
+                f"{output_mode:<9} {count} symbols: {elapsed * 1000:8.2f} ms"
+                f"  (per-line print {baseline * 1000:8.2f} ms, {baseline / elapsed:5.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
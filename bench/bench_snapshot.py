@@ -0,0 +1,181 @@
+"""Per-phase scaling benchmark for the snapshot pipeline.
+
+usage: python3 bench/bench_snapshot.py DATA_DIR [--repeat 3] [--json-backend auto] [--strict]
+                                       [--workers N] [--output results.json] [--compare base.json]
+
+DATA_DIR holds spine.jsonl and intents.jsonl (see bench/generate.py). Every
+phase (spine parse, intent parse, entry assembly, each renderer) is timed
+separately; the best of --repeat runs is reported together with throughput and
+peak RSS after the phase. Results are written as JSON so runs on different
+commits can be compared with --compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "snapshot"))
+
+import synthdesk_snapshot  # noqa: E402
+
+_RENDER_MODES = ("markdown", "html", "terminal", "json")
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def _line_count(path: Path, meta: Dict[str, Any] | None, key: str) -> int:
+    if meta is not None and key in meta:
+        return int(meta[key]["lines"])
+    lines = 0
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 24), b""):
+            lines += block.count(b"\n")
+    return lines
+
+
+def _commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _timed(phases: Dict[str, Dict[str, Any]], name: str, run: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - started
+    phase = phases.setdefault(name, {"seconds": seconds})
+    phase["seconds"] = min(phase["seconds"], seconds)
+    phase["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def run_benchmark(
+    spine_path: Path, intents_path: Path, repeat: int, json_backend: str, strict: bool, workers: int
+) -> Dict[str, Any]:
+    meta_path = spine_path.parent / "meta.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else None
+    inputs = {
+        "spine": {"bytes": spine_path.stat().st_size, "lines": _line_count(spine_path, meta, "spine")},
+        "intents": {
+            "bytes": intents_path.stat().st_size,
+            "lines": _line_count(intents_path, meta, "intents"),
+        },
+    }
+    backend = synthdesk_snapshot._resolve_json_backend(json_backend)
+    phases: Dict[str, Dict[str, Any]] = {}
+    for _ in range(repeat):
+        spine_summary = _timed(
+            phases,
+            "parse_spine",
+            lambda: synthdesk_snapshot._parse_event_spine(
+                spine_path, strict=strict, workers=workers, json_backend=backend
+            ),
+        )
+        intent_summary = _timed(
+            phases,
+            "parse_intents",
+            lambda: synthdesk_snapshot._parse_router_intents(intents_path, json_backend=backend),
+        )
+
+        def _assemble() -> list[Dict[str, Any]]:
+            symbols = synthdesk_snapshot._select_symbols(spine_summary, intent_summary, None)
+            return synthdesk_snapshot._build_snapshot_entries(symbols, spine_summary, intent_summary)
+
+        entries = _timed(phases, "build_entries", _assemble)
+        for output_mode in _RENDER_MODES:
+            _timed(
+                phases,
+                f"render_{output_mode}",
+                lambda: synthdesk_snapshot._render_to_text(output_mode, "2025-12-22T00:00:00Z", entries),
+            )
+    for name, source in (("parse_spine", "spine"), ("parse_intents", "intents")):
+        seconds = phases[name]["seconds"]
+        phases[name]["lines_per_s"] = inputs[source]["lines"] / seconds if seconds else None
+        phases[name]["mb_per_s"] = inputs[source]["bytes"] / (1 << 20) / seconds if seconds else None
+    phases["build_entries"]["symbols"] = len(entries)
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "options": {"repeat": repeat, "json_backend": backend, "strict": strict, "workers": workers},
+        "inputs": inputs,
+        "generator": meta,
+        "phases": phases,
+    }
+
+
+def _print_report(results: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+    print(f"commit {results['commit'] or '?'}  python {results['python']}  {results['options']}")
+    for name, phase in results["phases"].items():
+        line = f"{name:<16} {phase['seconds'] * 1000:10.1f} ms"
+        if "mb_per_s" in phase and phase["mb_per_s"] is not None:
+            line += f"  {phase['lines_per_s']:12,.0f} lines/s  {phase['mb_per_s']:8.1f} MB/s"
+        if phase.get("peak_rss_mb") is not None:
+            line += f"  peak rss {phase['peak_rss_mb']:8.1f} MB"
+        base = (baseline or {}).get("phases", {}).get(name)
+        if base and base.get("seconds"):
+            line += f"  x{phase['seconds'] / base['seconds']:.2f} vs {baseline.get('commit') or 'base'}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time each phase of the snapshot pipeline.")
+    parser.add_argument("data_dir", type=Path, help="directory with spine.jsonl and intents.jsonl")
+    parser.add_argument("--repeat", type=int, default=3, metavar="N", help="report the best of N runs")
+    parser.add_argument("--json-backend", default="auto")
+    parser.add_argument("--strict", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, metavar="N")
+    parser.add_argument(
+        "--output", type=Path, default=None, metavar="PATH", help="write results JSON to PATH"
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="results JSON from another run to compare with",
+    )
+    args = parser.parse_args()
+    results = run_benchmark(
+        args.data_dir / "spine.jsonl",
+        args.data_dir / "intents.jsonl",
+        max(1, args.repeat),
+        args.json_backend,
+        args.strict,
+        args.workers,
+    )
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare is not None else None
+    _print_report(results, baseline)
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Seeded synthetic event spine and router intent logs.
+
+usage: python3 bench/generate.py OUT_DIR [--spine-size 100MB] [--intent-size 10MB]
+                                 [--symbols 3000] [--mix tick=90,market.regime=7,market.regime_change=3]
+                                 [--malformed 0.01] [--disorder 0.01] [--seed 1]
+
+Writes OUT_DIR/spine.jsonl, OUT_DIR/intents.jsonl and OUT_DIR/meta.json (the
+parameters plus line and byte counts). Output is streamed, so sizes up to tens
+of GB need no memory, and the same arguments always produce the same bytes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+_REGIMES = ("trend_up", "trend_down", "chop", "breakout", "mean_revert")
+_DIRECTIONS = ("long", "short", "flat")
+_RATIONALES = (
+    "momentum above threshold",
+    "volatility compressed",
+    "funding <skewed>",
+    "liquidity thin & widening",
+    "regime change confirmed",
+)
+_START_S = 1_766_361_600  # 2025-12-22T00:00:00Z
+_WRITE_CHUNK = 1 << 20
+
+
+def _size(value: str) -> int:
+    text = value.strip().upper()
+    number = text.rstrip("KMGB")
+    unit = text[len(number) :]
+    if unit not in _SIZE_UNITS or not number:
+        raise argparse.ArgumentTypeError(f"expected a size such as 512KB, 100MB or 2GB, got {value!r}")
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def _mix(value: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in value.split(","):
+        name, sep, weight = part.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected EVENT_TYPE=WEIGHT, got {part!r}")
+        weights[name.strip()] = float(weight)
+    if sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("weights must not all be zero")
+    return weights
+
+
+class _Clock:
+    """Monotonic synthetic time with a configurable share of late (out-of-order) stamps."""
+
+    def __init__(self, rng: random.Random, disorder: float) -> None:
+        self.rng = rng
+        self.disorder = disorder
+        self.micros = _START_S * 1_000_000
+        self._second = -1
+        self._prefix = ""
+
+    def stamp(self) -> str:
+        self.micros += self.rng.randrange(1, 20_000)
+        micros = self.micros
+        if self.disorder and self.rng.random() < self.disorder:
+            micros -= self.rng.randrange(1, 120_000_000)
+        second, fraction = divmod(micros, 1_000_000)
+        if second != self._second:
+            self._second = second
+            self._prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        # Mix the layouts writers actually produce.
+        style = self.rng.randrange(4)
+        if style == 0:
+            return f"{self._prefix}Z"
+        if style == 1:
+            return f"{self._prefix}+00:00"
+        if style == 2:
+            return f"{self._prefix}.{fraction:06d}Z"
+        return f"{self._prefix}.{fraction:06d}+00:00"
+
+
+def _malformed_line(rng: random.Random, good: str) -> str:
+    kind = rng.randrange(5)
+    if kind == 0:
+        return "not json"
+    if kind == 1:
+        return good[: rng.randrange(1, len(good))]
+    if kind == 2:
+        return ""
+    if kind == 3:
+        return good.replace('"timestamp": "', '"timestamp": "yesterday ', 1)
+    return good.replace('"payload": {', '"payload": [{', 1).replace("}}", "}]}", 1)
+
+
+def _spine_line(rng: random.Random, clock: _Clock, symbols: list[str], event_type: str) -> str:
+    symbol = rng.choice(symbols)
+    timestamp = clock.stamp()
+    if event_type == "market.regime":
+        payload = (
+            f'"symbol": "{symbol}", "regime": "{rng.choice(_REGIMES)}", '
+            f'"confidence": {rng.random():.4f}'
+        )
+    elif event_type == "market.regime_change":
+        from_regime, to_regime = rng.sample(_REGIMES, 2)
+        payload = f'"symbol": "{symbol}", "from": "{from_regime}", "to": "{to_regime}"'
+    else:
+        payload = f'"symbol": "{symbol}", "px": {rng.random() * 1000:.6f}'
+    return f'{{"event_type": "{event_type}", "timestamp": "{timestamp}", "payload": {{{payload}}}}}'
+
+
+def _intent_line(rng: random.Random, clock: _Clock, symbols: list[str]) -> str:
+    symbol = rng.choice(symbols)
+    intent: Dict[str, Any] = {
+        "symbol": symbol,
+        "direction": rng.choice(_DIRECTIONS),
+        "size_pct": round(rng.random() * 10, 2),
+        "risk_cap": round(rng.random() * 0.05, 4),
+    }
+    if rng.random() < 0.7:
+        intent["rationale"] = rng.sample(_RATIONALES, rng.randrange(1, 4))
+    # Router versions disagree on the envelope; the fold accepts all three.
+    envelope = rng.randrange(3)
+    if envelope == 0:
+        record = {"timestamp": clock.stamp(), "payload": intent}
+    elif envelope == 1:
+        record = {"timestamp": clock.stamp(), "intent": intent}
+    else:
+        record = {"timestamp": clock.stamp(), "symbol": intent.pop("symbol"), "payload": intent}
+    return json.dumps(record)
+
+
+def _write_lines(
+    handle: BinaryIO, target_bytes: int, make_line: Callable[[], str], rng: random.Random, malformed: float
+) -> Dict[str, int]:
+    written = 0
+    lines = 0
+    bad = 0
+    chunk: list[str] = []
+    chunk_bytes = 0
+    while written + chunk_bytes < target_bytes:
+        line = make_line()
+        if malformed and rng.random() < malformed:
+            line = _malformed_line(rng, line)
+            bad += 1
+        chunk.append(line)
+        chunk_bytes += len(line) + 1
+        lines += 1
+        if chunk_bytes >= _WRITE_CHUNK:
+            handle.write(("\n".join(chunk) + "\n").encode("utf-8"))
+            written += chunk_bytes
+            chunk = []
+            chunk_bytes = 0
+    if chunk:
+        handle.write(("\n".join(chunk) + "\n").encode("utf-8"))
+        written += chunk_bytes
+    return {"bytes": written, "lines": lines, "malformed_lines": bad}
+
+
+def generate(
+    out_dir: Path,
+    spine_size: int,
+    intent_size: int,
+    symbol_count: int,
+    mix: Dict[str, float],
+    malformed: float,
+    disorder: float,
+    seed: int,
+) -> Dict[str, Any]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    symbols = [f"SYM{index:05d}" for index in range(symbol_count)]
+    event_types = list(mix)
+    weights = [mix[event_type] for event_type in event_types]
+    clock = _Clock(rng, disorder)
+
+    def _next_spine_line() -> str:
+        return _spine_line(rng, clock, symbols, rng.choices(event_types, weights)[0])
+
+    with (out_dir / "spine.jsonl").open("wb") as handle:
+        spine = _write_lines(handle, spine_size, _next_spine_line, rng, malformed)
+    clock = _Clock(rng, disorder)
+    with (out_dir / "intents.jsonl").open("wb") as handle:
+        intents = _write_lines(handle, intent_size, lambda: _intent_line(rng, clock, symbols), rng, malformed)
+    meta = {
+        "seed": seed,
+        "symbols": symbol_count,
+        "mix": mix,
+        "malformed": malformed,
+        "disorder": disorder,
+        "spine": spine,
+        "intents": intents,
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+    return meta
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic spine and intent logs.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--spine-size", type=_size, default=_size("100MB"), metavar="SIZE")
+    parser.add_argument("--intent-size", type=_size, default=_size("10MB"), metavar="SIZE")
+    parser.add_argument("--symbols", type=int, default=3000, metavar="N")
+    parser.add_argument(
+        "--mix",
+        type=_mix,
+        default=_mix("tick=90,market.regime=7,market.regime_change=3"),
+        metavar="TYPE=WEIGHT[,...]",
+        help="spine event-type weights (default tick=90,market.regime=7,market.regime_change=3)",
+    )
+    parser.add_argument(
+        "--malformed", type=float, default=0.01, metavar="RATIO", help="share of broken lines"
+    )
+    parser.add_argument(
+        "--disorder",
+        type=float,
+        default=0.01,
+        metavar="RATIO",
+        help="share of records stamped up to 2 minutes late",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    meta = generate(
+        args.out_dir,
+        args.spine_size,
+        args.intent_size,
+        args.symbols,
+        args.mix,
+        args.malformed,
+        args.disorder,
+        args.seed,
+    )
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,17 @@ ROUTER_INTENTS="$2"
 
 OUT_DIR="$(dirname "$0")"
 OUT_FILE="$OUT_DIR/index.html"
-TMP_FILE="$OUT_DIR/index.html.tmp"
+# The fingerprint record names the inputs and the command line; serve.sh publishes
+# OUT_DIR, so it lives outside it.
+STATE_DIR="${XDG_STATE_HOME:-$HOME/.local/state}/synthdesk"
+mkdir -p "$STATE_DIR"
 
+# --output replaces OUT_FILE atomically; --skip-unchanged leaves it alone (and
+# skips parsing) when neither input has changed since the last render.
 python3 synthdesk-tools/snapshot/synthdesk_snapshot.py \
   "$EVENT_SPINE" \
   "$ROUTER_INTENTS" \
   html \
-  > "$TMP_FILE"
-
-mv "$TMP_FILE" "$OUT_FILE"
+  --output "$OUT_FILE" \
+  --skip-unchanged \
+  --skip-unchanged-record "$STATE_DIR/index.html.inputs.json"
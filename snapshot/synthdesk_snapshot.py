@@ -2,7 +2,8 @@
 
 This tool is read-only.
 It parses immutable logs.
-It must never write, infer, or mutate state.
+It must never write to its inputs, infer, or mutate state.
+Derived caches (checkpoints) are written only to paths the caller names.
 Output format may change; logic may not.
 """
 
@@ -11,139 +12,1543 @@ Output format may change; logic may not.
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import bisect
+import contextlib
+import ctypes
+import ctypes.util
+import gzip
+import hashlib
 import html
 import json
+import mmap
+import os
+import re
+import select
 import sys
-from datetime import datetime, timezone
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict
+from stat import S_ISREG
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterable, Iterator
 
+# Checkpoints are derived caches; bump the version whenever fold state changes shape.
+# 2: records are ordered by _ts_key rather than by timestamp string.
+# 3: _ts_key accepts every ISO-8601 layout, not only the fixed one.
+# 4: _ts_key parses the other layouts itself, to nanoseconds, on every Python version.
+_CHECKPOINT_VERSION = 4
+_FINGERPRINT_WINDOW = 4096
+# Both regime event types contain this literal. A raw line without it cannot decode
+# to a regime event unless the writer escaped the value (e.g. "market\u002eregime"),
+# which is what strict mode exists to verify.
+_REGIME_EVENT_LITERAL = b"market.regime"
+# Unfiltered scans split the mapping in blocks of this size (aligned to newlines).
+_MAP_BLOCK_BYTES = 1 << 20
+# Parallel folds hand each worker a few ranges for balance, but never tiny ones.
+_RANGES_PER_WORKER = 4
+_MIN_RANGE_BYTES = 8 << 20
 
-def _is_valid_ts(value: Any) -> bool:
-    """Return True when timestamps are ISO-8601 UTC strings for lexicographic ordering."""
-    if not isinstance(value, str):
-        return False
-    if "T" not in value:
+
+def _stdlib_loads(line: bytes) -> Any:
+    return json.loads(line.decode("utf-8"))
+
+
+# Decoders for one JSONL record. Every backend must raise ValueError (or a subclass)
+# on malformed input and return plain dict/list/str/number objects. Lines a fast
+# backend rejects are retried with the stdlib (see _reference_loads), so folds are
+# identical whichever is installed; --self-check verifies that.
+_JSON_BACKENDS: Dict[str, Callable[[bytes], Any]] = {"stdlib": _stdlib_loads}
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    _JSON_BACKENDS["orjson"] = orjson.loads
+try:
+    import simdjson
+except ImportError:
+    pass
+else:
+    _JSON_BACKENDS["simdjson"] = simdjson.loads
+# "auto" resolves to the first installed backend in this order.
+_JSON_BACKEND_PREFERENCE = ("orjson", "simdjson", "stdlib")
+
+
+def _reads_wide_integers_as_floats(loads: Callable[[bytes], Any]) -> bool:
+    try:
+        return type(loads(b"[18446744073709551616]")[0]) is float
+    except ValueError:
         return False
-    return value.endswith("Z") or value.endswith("+00:00")
 
 
-def _is_newer(timestamp: str, current: Dict[str, Any] | None) -> bool:
+# Backends that read integers beyond 64 bits as floats instead of refusing them (orjson
+# 3.8 does); the folds check records they decode with _widened.
+_WIDENING_BACKENDS = frozenset(
+    name for name, loads in _JSON_BACKENDS.items() if _reads_wide_integers_as_floats(loads)
+)
+
+
+_UNDECODABLE = object()
+
+
+def _reference_loads(line: bytes) -> Any:
+    """Retry a line a fast backend rejected with the stdlib; _UNDECODABLE if it fails there too.
+
+    orjson and simdjson refuse some input json.loads accepts (NaN, Infinity,
+    integers beyond 64 bits, lone surrogates); see also _widened. The stdlib is
+    the reference.
+    """
+    try:
+        return _stdlib_loads(line)
+    except ValueError:
+        return _UNDECODABLE
+
+
+def _widened(value: Any) -> bool:
+    """True for a float a _WIDENING_BACKENDS decoder may have made of an integer beyond 64 bits.
+
+    A record whose rendered numbers include one is decoded again by the stdlib,
+    which keeps the integer exact.
+    """
+    return type(value) is float and not -(2**63) < value < 2**64
+
+
+def _resolve_json_backend(name: str) -> str:
+    if name == "auto":
+        return next(backend for backend in _JSON_BACKEND_PREFERENCE if backend in _JSON_BACKENDS)
+    if name not in _JSON_BACKENDS:
+        raise ValueError(f"json backend {name!r} is not installed")
+    return name
+
+
+# Epoch nanoseconds of recently seen "YYYY-MM-DDTHH:MM:SS" and "YYYY-MM-DDTHH:MM"
+# prefixes; records cluster in time, so nearly every key is a dict hit plus the fraction.
+_TS_SECOND_CACHE: Dict[str, int] = {}
+_TS_SECOND_CACHE_LIMIT = 1 << 16
+_TS_MINUTE_CACHE: Dict[str, int] = {}
+_TS_MINUTE_CACHE_LIMIT = 4096
+_TS_SECONDS = {f"{second:02d}": second * 1_000_000_000 for second in range(60)}
+_TS_FRACTION_SCALE = [10 ** (9 - digits) for digits in range(10)]
+
+# The layouts besides "YYYY-MM-DDTHH:MM:SS[.fraction]", spelled out rather than left to
+# datetime.fromisoformat, whose accepted subset grows with the Python version:
+# extended "YYYY-MM-DDTHH[:MM[:SS[(.|,)fraction]]]" and basic "YYYYMMDDTHH[MM[SS[(.|,)fraction]]]".
+_TS_OTHER_LAYOUTS = re.compile(
+    r"([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2})(?::([0-9]{2})(?::([0-9]{2})(?:[.,]([0-9]+))?)?)?"
+    r"|([0-9]{4})([0-9]{2})([0-9]{2})T([0-9]{2})(?:([0-9]{2})(?:([0-9]{2})(?:[.,]([0-9]+))?)?)?"
+)
+
+
+def _ts_fields_key(*fields: str | None) -> int | None:
+    # Epoch nanoseconds of year, month, day, hour[, minute[, second[, fraction]]] digit strings.
+    *clock, fraction = fields
+    try:
+        instant = datetime(*(int(field) for field in clock if field is not None), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    key = int(instant.timestamp()) * 1_000_000_000
+    if fraction:
+        fraction = fraction[:9]
+        key += int(fraction) * _TS_FRACTION_SCALE[len(fraction)]
+    return key
+
+
+def _ts_minute_key(prefix: str) -> int | None:
+    if prefix[4] != "-" or prefix[7] != "-" or prefix[10] != "T" or prefix[13] != ":":
+        return None
+    fields = (prefix[0:4], prefix[5:7], prefix[8:10], prefix[11:13], prefix[14:16])
+    if not all(field.isdigit() and field.isascii() for field in fields):
+        return None
+    return _ts_fields_key(*fields, None)
+
+
+def _ts_second_key(prefix: str) -> int | None:
+    seconds = _TS_SECONDS.get(prefix[17:19])
+    if seconds is None or prefix[16] != ":":
+        return None
+    minute_prefix = prefix[:16]
+    minute = _TS_MINUTE_CACHE.get(minute_prefix)
+    if minute is None:
+        minute = _ts_minute_key(minute_prefix)
+        if minute is None:
+            return None
+        if len(_TS_MINUTE_CACHE) >= _TS_MINUTE_CACHE_LIMIT:
+            _TS_MINUTE_CACHE.clear()
+        _TS_MINUTE_CACHE[minute_prefix] = minute
+    return minute + seconds
+
+
+def _ts_key_other(value: str, end: int) -> int | None:
+    match = _TS_OTHER_LAYOUTS.fullmatch(value, 0, end)
+    if match is None:
+        return None
+    groups = match.groups()
+    return _ts_fields_key(*(groups[:7] if groups[0] is not None else groups[7:]))
+
+
+def _ts_key(value: Any) -> int | None:
+    """Epoch nanoseconds for an ISO-8601 timestamp ending in Z or +00:00, else None.
+
+    All "latest wins" comparisons use this key, so Z and +00:00 stamps order
+    correctly against each other. "YYYY-MM-DDTHH:MM:SS[.fraction]" is parsed in
+    place, the other layouts in _TS_OTHER_LAYOUTS by a regular expression; the
+    result never depends on the Python version. Fractions beyond nanoseconds are
+    truncated.
+    """
+    if type(value) is not str:
+        return None
+    if value[-1:] == "Z":
+        end = len(value) - 1
+    elif value[-6:] == "+00:00":
+        end = len(value) - 6
+    else:
+        return None
+    if end < 19:
+        return _ts_key_other(value, end)
+    prefix = value[:19]
+    second = _TS_SECOND_CACHE.get(prefix)
+    if second is None:
+        second = _ts_second_key(prefix)
+        if second is None:
+            return _ts_key_other(value, end)
+        if len(_TS_SECOND_CACHE) >= _TS_SECOND_CACHE_LIMIT:
+            _TS_SECOND_CACHE.clear()
+        _TS_SECOND_CACHE[prefix] = second
+    if end == 19:
+        return second
+    fraction = value[20:end]
+    if value[19] != "." or not fraction.isdigit() or not fraction.isascii():
+        return _ts_key_other(value, end)
+    if end > 29:
+        return second + int(fraction[:9])
+    return second + int(fraction) * _TS_FRACTION_SCALE[end - 20]
+
+
+def _same_layout(timestamp: str, other: str) -> bool:
+    """True when two stamps share a layout _ts_key parses in place, so that they order as strings.
+
+    Same length, extended date, same fraction separator and same suffix: the digits
+    then line up field by field, and string order is key order for valid stamps.
+    """
+    return (
+        len(timestamp) == len(other)
+        and timestamp[10:11] == "T" == other[10:11]
+        and timestamp[19:20] == other[19:20]
+        and timestamp[-1:] == other[-1:]
+    )
+
+
+def _is_valid_ts(value: Any) -> bool:
+    """Return True when value is an ISO-8601 UTC timestamp _ts_key can order."""
+    return _ts_key(value) is not None
+
+
+class _Absent:
+    """Marks an optional payload field that was not present (distinct from JSON null)."""
+
+    __slots__ = ()
+
+    def __reduce__(self) -> str:
+        # Unpickles (e.g. from a worker process) to the module singleton.
+        return "_ABSENT"
+
+
+_ABSENT = _Absent()
+
+
+def _intern(value: Any) -> Any:
+    # Regimes and directions come from a handful of values; share one string per value.
+    return sys.intern(value) if type(value) is str else value
+
+
+# Fold state keeps one slotted record per symbol and event type instead of a dict;
+# at tens of thousands of symbols the dicts dominated memory and GC time. Records
+# convert to and from the dicts checkpoints (and --self-check digests) have always used.
+
+
+class _Record:
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class _RegimeRecord(_Record):
+    __slots__ = ("timestamp", "ts_key", "regime", "confidence")
+
+    def __init__(self, timestamp: str, ts_key: int, regime: str, confidence: Any = _ABSENT) -> None:
+        self.timestamp = timestamp
+        self.ts_key = ts_key
+        self.regime = regime
+        self.confidence = confidence
+
+    def as_dict(self) -> Dict[str, Any]:
+        entry = {"timestamp": self.timestamp, "regime": self.regime}
+        if self.confidence is not _ABSENT:
+            entry["confidence"] = self.confidence
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "_RegimeRecord":
+        timestamp = entry["timestamp"]
+        confidence = entry.get("confidence", _ABSENT)
+        return cls(timestamp, _ts_key(timestamp), _intern(entry.get("regime")), confidence)
+
+
+class _ChangeRecord(_Record):
+    __slots__ = ("timestamp", "ts_key", "from_regime", "to_regime", "confidence")
+
+    def __init__(
+        self, timestamp: str, ts_key: int, from_regime: str, to_regime: str, confidence: Any = _ABSENT
+    ) -> None:
+        self.timestamp = timestamp
+        self.ts_key = ts_key
+        self.from_regime = from_regime
+        self.to_regime = to_regime
+        self.confidence = confidence
+
+    def as_dict(self) -> Dict[str, Any]:
+        entry = {"timestamp": self.timestamp, "from": self.from_regime, "to": self.to_regime}
+        if self.confidence is not _ABSENT:
+            entry["confidence"] = self.confidence
+        return entry
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "_ChangeRecord":
+        timestamp = entry["timestamp"]
+        return cls(
+            timestamp,
+            _ts_key(timestamp),
+            _intern(entry.get("from")),
+            _intern(entry.get("to")),
+            entry.get("confidence", _ABSENT),
+        )
+
+
+class _IntentRecord(_Record):
+    __slots__ = ("timestamp", "ts_key", "direction", "size_pct", "risk_cap", "rationale")
+
+    def __init__(
+        self, timestamp: str, ts_key: int, direction: Any, size_pct: Any, risk_cap: Any, rationale: Any
+    ) -> None:
+        self.timestamp = timestamp
+        self.ts_key = ts_key
+        self.direction = direction
+        self.size_pct = size_pct
+        self.risk_cap = risk_cap
+        self.rationale = rationale
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "direction": self.direction,
+            "size_pct": self.size_pct,
+            "risk_cap": self.risk_cap,
+            "rationale": self.rationale,
+        }
+
+    @classmethod
+    def from_dict(cls, timestamp: str, intent: Dict[str, Any], ts_key: int | None = None) -> "_IntentRecord":
+        return cls(
+            timestamp,
+            _ts_key(timestamp) if ts_key is None else ts_key,
+            _intern(intent.get("direction")),
+            intent.get("size_pct"),
+            intent.get("risk_cap"),
+            intent.get("rationale"),
+        )
+
+
+def _record_as_dict(record: Any) -> Dict[str, Any]:
+    # json.dumps default= hook for summaries holding fold records.
+    if isinstance(record, _Record):
+        return record.as_dict()
+    raise TypeError(f"{type(record).__name__} is not JSON serializable")
+
+
+def _is_newer(ts_key: int, current: Any, or_equal: bool = False) -> bool:
+    # or_equal lets a fold that sees records last-to-first keep the earliest of equal timestamps,
+    # exactly as a forward fold does.
     if current is None:
         return True
-    current_ts = current.get("timestamp")
-    if not isinstance(current_ts, str):
-        return True
-    return timestamp > current_ts
+    current_key = current.ts_key
+    return ts_key > current_key or (or_equal and ts_key == current_key)
 
 
-def _parse_event_spine(path: Path) -> Dict[str, Dict[str, Dict[str, Any]]]:
-    latest_regime_by_symbol: Dict[str, Dict[str, Any]] = {}
-    latest_change_by_symbol: Dict[str, Dict[str, Any]] = {}
-    try:
-        with path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                if not line.strip():
-                    continue
-                try:
-                    event = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if not isinstance(event, dict):
-                    continue
-                event_type = event.get("event_type")
-                if event_type not in {"market.regime", "market.regime_change"}:
-                    continue
-                timestamp = event.get("timestamp")
-                if not _is_valid_ts(timestamp):
+def _counted_lines(lines: Iterable[bytes], counts: Counter) -> Iterator[bytes]:
+    for line in lines:
+        counts["lines_fed"] += 1
+        yield line
+
+
+def _timed_loads(loads: Callable[[bytes], Any], counts: Counter) -> Callable[[bytes], Any]:
+    # Only used under --stats: two clock reads per record are not free.
+    perf_counter_ns = time.perf_counter_ns
+
+    def _loads(line: bytes) -> Any:
+        started = perf_counter_ns()
+        try:
+            return loads(line)
+        finally:
+            counts["decode_ns"] += perf_counter_ns() - started
+
+    return _loads
+
+
+class _SpineFold:
+    """Latest market.regime / market.regime_change per symbol, folded line by line."""
+
+    __slots__ = (
+        "latest_regime_by_symbol",
+        "latest_change_by_symbol",
+        "prefilter",
+        "reversed_input",
+        "json_backend",
+        "touched",
+        "cutoff",
+        "counts",
+    )
+
+    def __init__(
+        self,
+        prefilter: bool = True,
+        reversed_input: bool = False,
+        json_backend: str = "stdlib",
+        cutoff: str | None = None,
+        counts: Counter | None = None,
+    ) -> None:
+        self.latest_regime_by_symbol: Dict[str, _RegimeRecord] = {}
+        self.latest_change_by_symbol: Dict[str, _ChangeRecord] = {}
+        # Reject lines that cannot be regime events before paying for json.loads.
+        self.prefilter = prefilter
+        # Set when lines arrive last-to-first, so ties resolve as in a forward fold.
+        self.reversed_input = reversed_input
+        # Stored by name so folds stay picklable for worker processes.
+        self.json_backend = json_backend
+        # When set, every (event_type, symbol) whose latest entry is replaced is added here.
+        self.touched: set[tuple[str, str]] | None = None
+        # As-of folds ignore records stamped after the cutoff.
+        self.cutoff = cutoff
+        # --stats counters; None keeps the fold loops free of bookkeeping.
+        self.counts = counts
+
+    @property
+    def record_literal(self) -> bytes | None:
+        return _REGIME_EVENT_LITERAL if self.prefilter else None
+
+    def feed(self, lines: Iterable[bytes]) -> None:
+        self.feed_events(self._decode(lines))
+
+    def _decode(self, lines: Iterable[bytes]) -> Iterator[Any]:
+        prefilter = self.prefilter
+        loads = _JSON_BACKENDS[self.json_backend]
+        retry = self.json_backend != "stdlib"
+        widens = self.json_backend in _WIDENING_BACKENDS
+        counts = self.counts
+        if counts is not None:
+            lines, loads = _counted_lines(lines, counts), _timed_loads(loads, counts)
+        for line in lines:
+            # File scans already drop these (see _Stats.report); this is for lines fed directly.
+            if prefilter and _REGIME_EVENT_LITERAL not in line:
+                continue
+            if not line.strip():
+                if counts is not None:
+                    counts["rejected_blank"] += 1
+                continue
+            try:
+                event = loads(line)
+            except ValueError:
+                event = _reference_loads(line) if retry else _UNDECODABLE
+                if event is _UNDECODABLE:
+                    if counts is not None:
+                        counts["rejected_bad_json"] += 1
                     continue
-                payload = event.get("payload")
-                if not isinstance(payload, dict):
+            else:
+                if widens and type(event) is dict:
+                    payload = event.get("payload")
+                    if type(payload) is dict and _widened(payload.get("confidence")):
+                        event = _stdlib_loads(line)
+            yield event
+
+    def feed_events(self, events: Iterable[Any]) -> None:
+        latest_regime_by_symbol = self.latest_regime_by_symbol
+        latest_change_by_symbol = self.latest_change_by_symbol
+        or_equal = self.reversed_input
+        touched = self.touched
+        cutoff_key = None if self.cutoff is None else _ts_key(self.cutoff)
+        counts = self.counts
+        intern = sys.intern
+        for event in events:
+            if not isinstance(event, dict):
+                if counts is not None:
+                    counts["rejected_non_dict"] += 1
+                continue
+            event_type = event.get("event_type")
+            if event_type not in {"market.regime", "market.regime_change"}:
+                if counts is not None:
+                    counts["rejected_event_type"] += 1
+                continue
+            payload = event.get("payload")
+            if not isinstance(payload, dict):
+                if counts is not None:
+                    counts["rejected_payload"] += 1
+                continue
+            symbol = payload.get("symbol")
+            if not isinstance(symbol, str):
+                if counts is not None:
+                    counts["rejected_symbol"] += 1
+                continue
+            if event_type == "market.regime":
+                regime = payload.get("regime")
+                if not isinstance(regime, str):
+                    if counts is not None:
+                        counts["rejected_value"] += 1
                     continue
-                symbol = payload.get("symbol")
-                if not isinstance(symbol, str):
+                latest_by_symbol = latest_regime_by_symbol
+            else:
+                from_regime = payload.get("from")
+                to_regime = payload.get("to")
+                if not isinstance(from_regime, str) or not isinstance(to_regime, str):
+                    if counts is not None:
+                        counts["rejected_value"] += 1
                     continue
-                if event_type == "market.regime":
-                    regime = payload.get("regime")
-                    if not isinstance(regime, str):
-                        continue
-                    current = latest_regime_by_symbol.get(symbol)
-                    if not _is_newer(timestamp, current):
-                        continue
-                    entry = {"timestamp": timestamp, "regime": regime}
-                    if "confidence" in payload:
-                        entry["confidence"] = payload.get("confidence")
-                    latest_regime_by_symbol[symbol] = entry
-                else:
-                    from_regime = payload.get("from")
-                    to_regime = payload.get("to")
-                    if not isinstance(from_regime, str) or not isinstance(to_regime, str):
-                        continue
-                    current = latest_change_by_symbol.get(symbol)
-                    if not _is_newer(timestamp, current):
-                        continue
-                    entry = {"timestamp": timestamp, "from": from_regime, "to": to_regime}
-                    if "confidence" in payload:
-                        entry["confidence"] = payload.get("confidence")
-                    latest_change_by_symbol[symbol] = entry
-    except OSError:
-        return {}
-    folded: Dict[str, Dict[str, Dict[str, Any]]] = {}
-    for symbol, regime_entry in latest_regime_by_symbol.items():
+                latest_by_symbol = latest_change_by_symbol
+            timestamp = event.get("timestamp")
+            current = latest_by_symbol.get(symbol)
+            if (
+                counts is None
+                and current is not None
+                and type(timestamp) is str
+                and timestamp < current.timestamp
+                and _same_layout(timestamp, current.timestamp)
+            ):
+                # Older than the current record: drop it unparsed. Only the rejection
+                # counts could tell an invalid stamp dropped here from one _ts_key rejects.
+                continue
+            ts_key = _ts_key(timestamp)
+            if ts_key is None:
+                if counts is not None:
+                    counts["rejected_timestamp"] += 1
+                continue
+            if cutoff_key is not None and ts_key > cutoff_key:
+                if counts is not None:
+                    counts["rejected_after_cutoff"] += 1
+                continue
+            if counts is not None:
+                counts["records_folded"] += 1
+            if not _is_newer(ts_key, current, or_equal):
+                continue
+            if event_type == "market.regime":
+                record = _RegimeRecord(timestamp, ts_key, intern(regime), payload.get("confidence", _ABSENT))
+            else:
+                record = _ChangeRecord(
+                    timestamp,
+                    ts_key,
+                    intern(from_regime),
+                    intern(to_regime),
+                    payload.get("confidence", _ABSENT),
+                )
+            latest_by_symbol[intern(symbol)] = record
+            if touched is not None:
+                touched.add((event_type, symbol))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        folded: Dict[str, Dict[str, Any]] = {}
+        for symbol, regime_entry in self.latest_regime_by_symbol.items():
+            symbol_entry = {"market.regime": regime_entry}
+            change_entry = self.latest_change_by_symbol.get(symbol)
+            if change_entry is not None:
+                symbol_entry["market.regime_change"] = change_entry
+            folded[symbol] = symbol_entry
+        return folded
+
+    def symbol_summary(self, symbol: str) -> Dict[str, Any] | None:
+        """summary()[symbol] without building the whole summary."""
+        regime_entry = self.latest_regime_by_symbol.get(symbol)
+        if regime_entry is None:
+            return None
         symbol_entry = {"market.regime": regime_entry}
-        change_entry = latest_change_by_symbol.get(symbol)
+        change_entry = self.latest_change_by_symbol.get(symbol)
         if change_entry is not None:
             symbol_entry["market.regime_change"] = change_entry
-        folded[symbol] = symbol_entry
-    return folded
+        return symbol_entry
+
+    def merge(self, later: "_SpineFold") -> None:
+        """Fold in the result of a fold over records that come after this one's in the file."""
+        for mine, theirs in (
+            (self.latest_regime_by_symbol, later.latest_regime_by_symbol),
+            (self.latest_change_by_symbol, later.latest_change_by_symbol),
+        ):
+            for symbol, record in theirs.items():
+                if _is_newer(record.ts_key, mine.get(symbol)):
+                    mine[symbol] = record
+        if self.counts is not None and later.counts is not None:
+            self.counts.update(later.counts)
+
+    def dump_state(self) -> Dict[str, Any]:
+        return {
+            "latest_regime_by_symbol": {
+                symbol: record.as_dict() for symbol, record in self.latest_regime_by_symbol.items()
+            },
+            "latest_change_by_symbol": {
+                symbol: record.as_dict() for symbol, record in self.latest_change_by_symbol.items()
+            },
+        }
+
+    def load_state(self, state: Any) -> None:
+        self.latest_regime_by_symbol = {
+            sys.intern(symbol): _RegimeRecord.from_dict(entry)
+            for symbol, entry in _checked_entry_map(state["latest_regime_by_symbol"]).items()
+        }
+        self.latest_change_by_symbol = {
+            sys.intern(symbol): _ChangeRecord.from_dict(entry)
+            for symbol, entry in _checked_entry_map(state["latest_change_by_symbol"]).items()
+        }
+
+
+def _checked_entry_map(value: Any) -> Dict[str, Dict[str, Any]]:
+    # Checkpoints are caches; anything that does not look like fold state is rejected.
+    if not isinstance(value, dict):
+        raise ValueError("checkpoint state is not a mapping")
+    for symbol, entry in value.items():
+        if not isinstance(symbol, str):
+            raise ValueError("checkpoint symbol is not a string")
+        if not isinstance(entry, dict) or not _is_valid_ts(entry.get("timestamp")):
+            raise ValueError(f"checkpoint entry for {symbol!r} is malformed")
+    return value
+
+
+def _source_fingerprint(handle: BinaryIO, stat: os.stat_result, offset: int) -> Dict[str, Any]:
+    """Identify the consumed prefix [0, offset) of an append-only file."""
+    head_end = min(offset, _FINGERPRINT_WINDOW)
+    tail_start = max(0, offset - _FINGERPRINT_WINDOW)
+    handle.seek(0)
+    head = handle.read(head_end)
+    handle.seek(tail_start)
+    tail = handle.read(offset - tail_start)
+    return {
+        "device": stat.st_dev,
+        "inode": stat.st_ino,
+        "offset": offset,
+        "head_sha256": hashlib.sha256(head).hexdigest(),
+        "tail_sha256": hashlib.sha256(tail).hexdigest(),
+    }
 
 
-def _parse_router_intents(path: Path) -> Dict[str, Dict[str, Any]]:
-    latest_intent_by_symbol: Dict[str, Dict[str, Any]] = {}
-    latest_ts_by_symbol: Dict[str, str] = {}
+def _fingerprint_matches(handle: BinaryIO, stat: os.stat_result, source: Any) -> bool:
+    # A different inode, a shorter file or a changed prefix means the log was
+    # rotated, truncated or rewritten; the checkpoint no longer describes it.
+    if not isinstance(source, dict):
+        return False
+    offset = source.get("offset")
+    if not isinstance(offset, int) or offset < 0 or offset > stat.st_size:
+        return False
+    if source.get("device") != stat.st_dev or source.get("inode") != stat.st_ino:
+        return False
+    return _source_fingerprint(handle, stat, offset) == source
+
+
+def _resume_offset(handle: BinaryIO, stat: os.stat_result, source: Dict[str, Any] | None) -> int | None:
+    """Where a tail that consumed `source` continues reading; None when the file was replaced."""
+    if source is None:
+        return 0
+    if (
+        stat.st_size == source["offset"]
+        and stat.st_ino == source["inode"]
+        and stat.st_dev == source["device"]
+    ):
+        # Nothing appended; skip hashing the prefix.
+        return stat.st_size
+    if _fingerprint_matches(handle, stat, source):
+        return source["offset"]
+    return None
+
+
+def _load_checkpoint(path: Path, kind: str) -> Dict[str, Any] | None:
     try:
         with path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                if not line.strip():
-                    continue
-                try:
-                    record = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                if not isinstance(record, dict):
-                    continue
-                timestamp = record.get("timestamp")
-                if not _is_valid_ts(timestamp):
-                    continue
-                intent = record.get("payload")
-                if not isinstance(intent, dict):
-                    intent = record.get("intent")
-                if not isinstance(intent, dict):
-                    continue
-                symbol = record.get("symbol")
-                if not isinstance(symbol, str):
-                    symbol = intent.get("symbol")
-                if not isinstance(symbol, str):
-                    continue
-                current_ts = latest_ts_by_symbol.get(symbol)
-                if isinstance(current_ts, str) and timestamp <= current_ts:
+            checkpoint = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(checkpoint, dict):
+        return None
+    if checkpoint.get("version") != _CHECKPOINT_VERSION or checkpoint.get("kind") != kind:
+        return None
+    return checkpoint
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _store_checkpoint(path: Path, kind: str, source: Dict[str, Any], state: Dict[str, Any]) -> None:
+    checkpoint = {"version": _CHECKPOINT_VERSION, "kind": kind, "source": source, "state": state}
+    try:
+        # ASCII escapes keep lone surrogates (from records or non-UTF-8 argv) writable.
+        _atomic_write_text(path, json.dumps(checkpoint, separators=(",", ":")))
+    except (OSError, ValueError):
+        # A checkpoint is an optimisation; failing to persist it must not fail the render.
+        pass
+
+
+def _input_fingerprints(paths: list[Path]) -> list[Dict[str, Any] | None]:
+    # One entry per input: its whole-file fingerprint plus mtime, or None when missing.
+    # A pipe or FIFO cannot be fingerprinted without consuming it, so it gets None too
+    # and _inputs_unchanged always treats it as changed.
+    fingerprints: list[Dict[str, Any] | None] = []
+    for path in paths:
+        try:
+            if not _is_regular_file(path):
+                fingerprints.append(None)
+                continue
+            with path.open("rb") as handle:
+                stat = os.fstat(handle.fileno())
+                fingerprint = _source_fingerprint(handle, stat, stat.st_size)
+        except OSError:
+            fingerprints.append(None)
+            continue
+        fingerprints.append({"file": fingerprint, "mtime_ns": stat.st_mtime_ns})
+    return fingerprints
+
+
+def _inputs_unchanged(record_path: Path, paths: list[Path], argv: list[str]) -> bool:
+    """True when `paths` still match the fingerprints stored at record_path by the same command.
+
+    The size, inode and mtime are compared first; the head/tail hashes are read
+    only when those agree, so a changed input costs one stat().
+    """
+    record = _load_checkpoint(record_path, "render-inputs")
+    if record is None or not isinstance(record.get("source"), dict):
+        return False
+    source = record["source"]
+    inputs = source.get("inputs")
+    if source.get("argv") != argv or not isinstance(inputs, list) or len(inputs) != len(paths):
+        return False
+    for path, stored in zip(paths, inputs):
+        try:
+            if not _is_regular_file(path):
+                return False
+            handle = path.open("rb")
+        except FileNotFoundError:
+            if stored is None:
+                continue
+            return False
+        except OSError:
+            return False
+        with handle:
+            stat = os.fstat(handle.fileno())
+            if not isinstance(stored, dict) or stored.get("mtime_ns") != stat.st_mtime_ns:
+                return False
+            fingerprint = stored.get("file")
+            if not isinstance(fingerprint, dict) or fingerprint.get("offset") != stat.st_size:
+                return False
+            if not _fingerprint_matches(handle, stat, fingerprint):
+                return False
+    return True
+
+
+def _inputs_record_path(output_path: Path) -> Path:
+    # A dotfile, since outputs usually sit in a web root: the record holds the full
+    # command line and inode numbers. --skip-unchanged-record moves it elsewhere.
+    return output_path.with_name(f".{output_path.name}.inputs.json")
+
+
+class _NotMappable(OSError):
+    """The input is a pipe or FIFO, or sits on a filesystem that refuses mmap."""
+
+
+def _is_regular_file(path: Path) -> bool:
+    # Checked before opening: pipes and FIFOs (e.g. <(zcat spine.gz)) can be read only
+    # once, front to back, and must not be consumed by a fingerprint or a seek.
+    return S_ISREG(path.stat().st_mode)
+
+
+def _map_file(handle: BinaryIO, size: int) -> mmap.mmap | None:
+    # mmap refuses empty files; callers treat None as "nothing to read".
+    if not S_ISREG(os.fstat(handle.fileno()).st_mode):
+        raise _NotMappable("not a regular file")
+    if size == 0:
+        return None
+    try:
+        return mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as exc:
+        raise _NotMappable(str(exc)) from exc
+
+
+def _read_line_blocks(handle: BinaryIO, limit: int | None = None) -> Iterator[bytes]:
+    """Read from the handle's position in blocks of about _MAP_BLOCK_BYTES, up to limit bytes or EOF.
+
+    Every block but the last ends with a newline; the last holds whatever follows
+    the final newline, if anything does.
+    """
+    pending = b""
+    remaining = limit
+    while remaining is None or remaining > 0:
+        block = handle.read(_MAP_BLOCK_BYTES if remaining is None else min(_MAP_BLOCK_BYTES, remaining))
+        if not block:
+            break
+        if remaining is not None:
+            remaining -= len(block)
+        last_newline = block.rfind(b"\n")
+        if last_newline < 0:
+            pending += block
+            continue
+        yield pending + block[: last_newline + 1]
+        pending = block[last_newline + 1 :]
+    if pending:
+        yield pending
+
+
+def _iter_read_lines(handle: BinaryIO, literal: bytes | None, counts: Counter | None) -> Iterator[bytes]:
+    """The records _iter_mapped_lines would yield for the rest of the file, read in blocks instead."""
+    for block in _read_line_blocks(handle):
+        if counts is not None:
+            counts["bytes_read"] += len(block)
+            counts["lines_read"] += block.count(b"\n") + (0 if block.endswith(b"\n") else 1)
+        if block.endswith(b"\n"):
+            block = block[:-1]
+        lines = block.split(b"\n")
+        if literal is None:
+            yield from lines
+        else:
+            yield from (line for line in lines if literal in line)
+
+
+def _iter_mapped_lines(mapped: mmap.mmap, start: int, end: int, literal: bytes | None) -> Iterator[bytes]:
+    """Yield the newline-delimited records in mapped[start:end] as bytes, without newlines.
+
+    With a literal, the scan jumps between occurrences of it and copies out only the
+    records that contain one; everything in between is never sliced or decoded.
+    """
+    pos = start
+    if literal is None:
+        while pos < end:
+            stop = min(end, pos + _MAP_BLOCK_BYTES)
+            if stop < end:
+                newline = mapped.rfind(b"\n", pos, stop)
+                if newline < 0:
+                    newline = mapped.find(b"\n", stop, end)
+                stop = end if newline < 0 else newline + 1
+            block = mapped[pos:stop]
+            if block.endswith(b"\n"):
+                block = block[:-1]
+            yield from block.split(b"\n")
+            pos = stop
+        return
+    while pos < end:
+        hit = mapped.find(literal, pos, end)
+        if hit < 0:
+            return
+        newline = mapped.rfind(b"\n", pos, hit)
+        line_start = pos if newline < 0 else newline + 1
+        newline = mapped.find(b"\n", hit, end)
+        line_end = end if newline < 0 else newline
+        yield mapped[line_start:line_end]
+        pos = line_end + 1
+
+
+def _count_scan(counts: Counter | None, mapped: mmap.mmap, start: int, end: int) -> None:
+    # Lines the prefilter skips never reach the fold, so reads are counted here.
+    if counts is None or start >= end:
+        return
+    lines = 0
+    for block_start in range(start, end, _MAP_BLOCK_BYTES):
+        lines += mapped[block_start : min(end, block_start + _MAP_BLOCK_BYTES)].count(b"\n")
+    if mapped[end - 1] != ord("\n"):
+        lines += 1
+    counts["bytes_read"] += end - start
+    counts["lines_read"] += lines
+
+
+def _iter_file_lines(handle: BinaryIO, literal: bytes | None, counts: Counter | None) -> Iterator[bytes]:
+    # Mapped when possible; pipes, FIFOs and filesystems without mmap are read in blocks.
+    try:
+        mapped = _map_file(handle, os.fstat(handle.fileno()).st_size)
+    except _NotMappable:
+        yield from _iter_read_lines(handle, literal, counts)
+        return
+    if mapped is None:
+        return
+    with mapped:
+        _count_scan(counts, mapped, 0, len(mapped))
+        yield from _iter_mapped_lines(mapped, 0, len(mapped), literal)
+
+
+def _fold_file(handle: BinaryIO, fold: Any) -> None:
+    fold.feed(_iter_file_lines(handle, fold.record_literal, fold.counts))
+
+
+def _iter_reversed_batches(
+    mapped: mmap.mmap, start: int, end: int, literal: bytes | None, counts: Counter | None = None
+) -> Iterator[list[bytes]]:
+    """Yield the records of mapped[start:end] in newline-aligned blocks, last record first."""
+    pos = end
+    while pos > start:
+        block_start = max(start, pos - _MAP_BLOCK_BYTES)
+        if block_start > start:
+            newline = mapped.rfind(b"\n", start, block_start)
+            block_start = start if newline < 0 else newline + 1
+        _count_scan(counts, mapped, block_start, pos)
+        block = mapped[block_start:pos]
+        if block.endswith(b"\n"):
+            block = block[:-1]
+        lines = block.split(b"\n")
+        if literal is not None:
+            lines = [line for line in lines if literal in line]
+        lines.reverse()
+        yield lines
+        pos = block_start
+
+
+def _fold_spine_reversed(handle: BinaryIO, fold: _SpineFold, symbols: Iterable[str]) -> None:
+    """Fold the spine from EOF backwards until every symbol has a regime and a regime change.
+
+    Stopping early is only equivalent to a full scan when records are appended in
+    non-decreasing timestamp order; symbols that never resolve force a scan to byte 0.
+    """
+    mapped = _map_file(handle, os.fstat(handle.fileno()).st_size)
+    if mapped is None:
+        return
+    pending = set(symbols)
+    with mapped:
+        for batch in _iter_reversed_batches(mapped, 0, len(mapped), fold.record_literal, fold.counts):
+            fold.feed(batch)
+            pending = {
+                symbol
+                for symbol in pending
+                if symbol not in fold.latest_regime_by_symbol or symbol not in fold.latest_change_by_symbol
+            }
+            if not pending:
+                return
+
+
+def _fold_resumable(path: Path, checkpoint_path: Path, kind: str, make_fold: Callable[[], Any]) -> Any:
+    """Fold `path` starting from a checkpoint, persisting progress for the next run.
+
+    Only newline-terminated records are checkpointed. An unterminated final line
+    (a writer mid-append) is folded into the returned state but not persisted,
+    so the result always equals a full rescan of the file as it is now.
+    """
+    with path.open("rb") as handle:
+        stat = os.fstat(handle.fileno())
+        fold = None
+        offset = 0
+        checkpoint = _load_checkpoint(checkpoint_path, kind)
+        if checkpoint is not None and _fingerprint_matches(handle, stat, checkpoint.get("source")):
+            fold = make_fold()
+            try:
+                fold.load_state(checkpoint.get("state"))
+                offset = checkpoint["source"]["offset"]
+            except (KeyError, TypeError, ValueError):
+                fold = None
+        if fold is None:
+            fold = make_fold()
+            offset = 0
+            checkpoint = None
+
+        partial = b""
+        mapped = _map_file(handle, stat.st_size)
+        if mapped is None:
+            consumed = offset
+        else:
+            with mapped:
+                last_newline = mapped.rfind(b"\n", offset)
+                consumed = offset if last_newline < 0 else last_newline + 1
+                _count_scan(fold.counts, mapped, offset, len(mapped))
+                fold.feed(_iter_mapped_lines(mapped, offset, consumed, fold.record_literal))
+                partial = mapped[consumed:]
+        if checkpoint is None or consumed != offset:
+            _store_checkpoint(
+                checkpoint_path, kind, _source_fingerprint(handle, stat, consumed), fold.dump_state()
+            )
+    if partial:
+        fold.feed([partial])
+    return fold
+
+
+def _split_ranges(handle: BinaryIO, parts: int) -> list[tuple[int, int]]:
+    """Cut the file into at most `parts` contiguous byte ranges that start on record boundaries."""
+    size = os.fstat(handle.fileno()).st_size
+    mapped = _map_file(handle, size)
+    if mapped is None:
+        return []
+    bounds = [0]
+    with mapped:
+        for part in range(1, parts):
+            newline = mapped.find(b"\n", max(bounds[-1], size * part // parts))
+            if newline < 0:
+                break
+            if newline + 1 < size:
+                bounds.append(newline + 1)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _fold_spine_range(
+    path: Path, start: int, end: int, prefilter: bool, json_backend: str, counted: bool = False
+) -> _SpineFold:
+    # Runs in a worker process; must stay a picklable module-level function.
+    fold = _SpineFold(prefilter=prefilter, json_backend=json_backend, counts=Counter() if counted else None)
+    with path.open("rb") as handle:
+        mapped = _map_file(handle, end)
+        if mapped is not None:
+            with mapped:
+                _count_scan(fold.counts, mapped, start, end)
+                fold.feed(_iter_mapped_lines(mapped, start, end, fold.record_literal))
+    return fold
+
+
+def _fold_spine_parallel(path: Path, fold: _SpineFold, workers: int) -> None:
+    """Fold newline-aligned ranges in a process pool and merge them in file order.
+
+    "Latest per symbol" is associative and merge() keeps the earlier record on
+    equal timestamps, so the result is identical to the serial fold.
+    """
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        parts = min(workers * _RANGES_PER_WORKER, max(1, size // _MIN_RANGE_BYTES))
+        ranges = _split_ranges(handle, parts)
+    if len(ranges) <= 1:
+        with path.open("rb") as handle:
+            _fold_file(handle, fold)
+        return
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(
+            _fold_spine_range,
+            [path] * len(ranges),
+            starts,
+            ends,
+            [fold.prefilter] * len(ranges),
+            [fold.json_backend] * len(ranges),
+            [fold.counts is not None] * len(ranges),
+        ):
+            fold.merge(partial)
+
+
+def _iter_mapped_records(
+    mapped: mmap.mmap, start: int, end: int, literal: bytes | None
+) -> Iterator[tuple[int, bytes]]:
+    """Like _iter_mapped_lines, but yields (byte offset, record) pairs."""
+    pos = start
+    while pos < end:
+        line_start = pos
+        search_from = pos
+        if literal is not None:
+            hit = mapped.find(literal, pos, end)
+            if hit < 0:
+                return
+            newline = mapped.rfind(b"\n", pos, hit)
+            line_start = pos if newline < 0 else newline + 1
+            search_from = hit
+        newline = mapped.find(b"\n", search_from, end)
+        line_end = end if newline < 0 else newline
+        yield line_start, mapped[line_start:line_end]
+        pos = line_end + 1
+
+
+def _index_records(
+    tracker: _SpineFold,
+    offsets: Dict[tuple[str, str], tuple[int, int]],
+    mapped: mmap.mmap,
+    start: int,
+    end: int,
+) -> None:
+    # Feed records one at a time so every replacement can be pinned to its byte range.
+    touched: set[tuple[str, str]] = set()
+    tracker.touched = touched
+    for offset, line in _iter_mapped_records(mapped, start, end, tracker.record_literal):
+        tracker.feed((line,))
+        if touched:
+            for key in touched:
+                offsets[key] = (offset, len(line))
+            touched.clear()
+    tracker.touched = None
+
+
+def _dump_symbol_index(
+    tracker: _SpineFold, offsets: Dict[tuple[str, str], tuple[int, int]]
+) -> Dict[str, Any]:
+    state: Dict[str, Dict[str, list[Any]]] = {"market.regime": {}, "market.regime_change": {}}
+    latest = {
+        "market.regime": tracker.latest_regime_by_symbol,
+        "market.regime_change": tracker.latest_change_by_symbol,
+    }
+    for (event_type, symbol), (offset, length) in offsets.items():
+        state[event_type][symbol] = [offset, length, latest[event_type][symbol].timestamp]
+    return state
+
+
+def _load_symbol_index(
+    state: Any, tracker: _SpineFold, offsets: Dict[tuple[str, str], tuple[int, int]], limit: int
+) -> None:
+    # The tracker only needs timestamps to keep ordering records appended later.
+    for event_type, latest, placeholder in (
+        ("market.regime", tracker.latest_regime_by_symbol, lambda ts: _RegimeRecord(ts, _ts_key(ts), "")),
+        (
+            "market.regime_change",
+            tracker.latest_change_by_symbol,
+            lambda ts: _ChangeRecord(ts, _ts_key(ts), "", ""),
+        ),
+    ):
+        for symbol, (offset, length, timestamp) in state[event_type].items():
+            if not isinstance(offset, int) or not isinstance(length, int) or not _is_valid_ts(timestamp):
+                raise ValueError(f"symbol index entry for {symbol!r} is malformed")
+            if offset < 0 or length < 0 or offset + length > limit:
+                raise ValueError(f"symbol index entry for {symbol!r} is out of range")
+            latest[symbol] = placeholder(timestamp)
+            offsets[(event_type, symbol)] = (offset, length)
+
+
+def _fold_spine_indexed(
+    path: Path,
+    index_path: Path,
+    kind: str,
+    make_fold: Callable[[], _SpineFold],
+    symbols: Iterable[str] | None,
+) -> _SpineFold:
+    """Fold only the latest record per symbol, located through a sidecar offset index.
+
+    The index maps (event type, symbol) to the byte range of its winning record and
+    is brought up to date by scanning just the bytes appended since it was written.
+    Decoding those winning records with a fresh fold gives the same entries as a
+    full scan, at a cost that depends on the symbol count rather than spine size.
+    """
+    result = make_fold()
+    # --stats counts the scan; re-decoding the winning records would count them twice.
+    result.counts = None
+    with path.open("rb") as handle:
+        stat = os.fstat(handle.fileno())
+        tracker = make_fold()
+        offsets: Dict[tuple[str, str], tuple[int, int]] = {}
+        indexed = 0
+        index = _load_checkpoint(index_path, kind)
+        if index is not None and _fingerprint_matches(handle, stat, index.get("source")):
+            try:
+                indexed = index["source"]["offset"]
+                _load_symbol_index(index.get("state"), tracker, offsets, indexed)
+            except (KeyError, TypeError, ValueError):
+                index = None
+        if index is None:
+            tracker = make_fold()
+            offsets = {}
+            indexed = 0
+        mapped = _map_file(handle, stat.st_size)
+        if mapped is None:
+            return result
+        with mapped:
+            last_newline = mapped.rfind(b"\n", indexed)
+            consumed = indexed if last_newline < 0 else last_newline + 1
+            _count_scan(tracker.counts, mapped, indexed, len(mapped))
+            _index_records(tracker, offsets, mapped, indexed, consumed)
+            if index is None or consumed != indexed:
+                _store_checkpoint(
+                    index_path,
+                    kind,
+                    _source_fingerprint(handle, stat, consumed),
+                    _dump_symbol_index(tracker, offsets),
+                )
+            # An unterminated final record is honoured for this render but never indexed.
+            _index_records(tracker, offsets, mapped, consumed, len(mapped))
+            wanted = None if symbols is None else set(symbols)
+            ranges = sorted(
+                (offset, length)
+                for (_, symbol), (offset, length) in offsets.items()
+                if wanted is None or symbol in wanted
+            )
+            result.feed(mapped[offset : offset + length] for offset, length in ranges)
+    return result
+
+
+def _regime_event_key(line: bytes, loads: Callable[[bytes], Any]) -> int | None:
+    # Deliberately looser than _SpineFold.feed: a superset of the folded records can
+    # only widen a block's timestamp range, which keeps as-of stopping points safe.
+    try:
+        event = loads(line)
+    except ValueError:
+        event = _reference_loads(line)
+    if not isinstance(event, dict):
+        return None
+    if event.get("event_type") not in {"market.regime", "market.regime_change"}:
+        return None
+    return _ts_key(event.get("timestamp"))
+
+
+def _scan_time_blocks(
+    blocks: list[list[Any]],
+    mapped: mmap.mmap,
+    start: int,
+    end: int,
+    literal: bytes | None,
+    loads: Callable[[bytes], Any],
+    block_bytes: int,
+) -> None:
+    """Extend `blocks` ([start offset, min key, max key]; the last one open) over mapped[start:end]."""
+    for offset, line in _iter_mapped_records(mapped, start, end, literal):
+        if offset - blocks[-1][0] >= block_bytes:
+            blocks.append([offset, None, None])
+        ts_key = _regime_event_key(line, loads)
+        if ts_key is None:
+            continue
+        block = blocks[-1]
+        if block[1] is None or ts_key < block[1]:
+            block[1] = ts_key
+        if block[2] is None or ts_key > block[2]:
+            block[2] = ts_key
+
+
+def _load_time_blocks(state: Any, block_bytes: int, limit: int) -> list[list[Any]]:
+    if state["block_bytes"] != block_bytes:
+        raise ValueError("time index was built with a different block size")
+    blocks = state["blocks"]
+    previous = -1
+    for block in blocks:
+        start, min_key, max_key = block
+        if not isinstance(start, int) or start <= previous or start > limit:
+            raise ValueError("time index offsets are not increasing")
+        if (min_key is None) != (max_key is None) or not isinstance(min_key, (int, type(None))):
+            raise ValueError("time index block is malformed")
+        previous = start
+    if not blocks or blocks[0][0] != 0:
+        raise ValueError("time index does not start at byte 0")
+    return blocks
+
+
+def _as_of_stop_offset(blocks: list[list[Any]], cutoff_key: int, end: int) -> int:
+    # Trailing blocks whose earliest record is after the cutoff cannot contribute.
+    # Using each block's minimum (not the running maximum) keeps this exact even
+    # when records were appended out of timestamp order.
+    stop = end
+    for start, min_key, _ in reversed(blocks):
+        if min_key is not None and min_key <= cutoff_key:
+            break
+        stop = start
+    return stop
+
+
+def _fold_spine_as_of(
+    path: Path, index_path: Path, kind: str, fold: _SpineFold, block_bytes: int
+) -> None:
+    """Fold records stamped at or before fold.cutoff, reading only up to the last block that can hold one.
+
+    The sparse time index records, for every ~block_bytes of spine, the block's start
+    offset and the minimum and maximum regime timestamps inside it. It is extended
+    incrementally, like checkpoints, from the offset it was last written at.
+    """
+    with path.open("rb") as handle:
+        stat = os.fstat(handle.fileno())
+        blocks: list[list[Any]] = [[0, None, None]]
+        indexed = 0
+        index = _load_checkpoint(index_path, kind)
+        if index is not None and _fingerprint_matches(handle, stat, index.get("source")):
+            try:
+                indexed = index["source"]["offset"]
+                blocks = _load_time_blocks(index.get("state"), block_bytes, indexed)
+            except (KeyError, TypeError, ValueError):
+                index = None
+        if index is None:
+            blocks = [[0, None, None]]
+            indexed = 0
+        mapped = _map_file(handle, stat.st_size)
+        if mapped is None:
+            return
+        loads = _JSON_BACKENDS[fold.json_backend]
+        with mapped:
+            last_newline = mapped.rfind(b"\n", indexed)
+            consumed = indexed if last_newline < 0 else last_newline + 1
+            _scan_time_blocks(blocks, mapped, indexed, consumed, fold.record_literal, loads, block_bytes)
+            if index is None or consumed != indexed:
+                _store_checkpoint(
+                    index_path,
+                    kind,
+                    _source_fingerprint(handle, stat, consumed),
+                    {"block_bytes": block_bytes, "blocks": blocks},
+                )
+            _scan_time_blocks(blocks, mapped, consumed, len(mapped), fold.record_literal, loads, block_bytes)
+            stop = _as_of_stop_offset(blocks, _ts_key(fold.cutoff), len(mapped))
+            _count_scan(fold.counts, mapped, 0, stop)
+            fold.feed(_iter_mapped_lines(mapped, 0, stop, fold.record_literal))
+
+
+def _parse_event_spine(
+    path: Path,
+    *,
+    checkpoint_path: Path | None = None,
+    strict: bool = False,
+    reverse_symbols: Iterable[str] | None = None,
+    workers: int = 1,
+    json_backend: str = "stdlib",
+    symbol_index_path: Path | None = None,
+    index_symbols: Iterable[str] | None = None,
+    as_of: str | None = None,
+    time_index_path: Path | None = None,
+    time_index_block_bytes: int = 4 << 20,
+    counts: Counter | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    def _make_fold() -> _SpineFold:
+        return _SpineFold(prefilter=not strict, json_backend=json_backend, cutoff=as_of, counts=counts)
+
+    try:
+        try:
+            if not _is_regular_file(path):
+                # Indexes, checkpoints, reverse and parallel scans all need to seek.
+                raise _NotMappable("not a regular file")
+            if as_of is not None and time_index_path is not None:
+                fold = _make_fold()
+                kind = "time-index-strict" if strict else "time-index"
+                _fold_spine_as_of(path, time_index_path, kind, fold, time_index_block_bytes)
+            elif symbol_index_path is not None:
+                kind = "symbol-index-strict" if strict else "symbol-index"
+                fold = _fold_spine_indexed(path, symbol_index_path, kind, _make_fold, index_symbols)
+            elif workers > 1:
+                fold = _make_fold()
+                _fold_spine_parallel(path, fold, workers)
+            elif reverse_symbols is not None:
+                fold = _SpineFold(
+                    prefilter=not strict, reversed_input=True, json_backend=json_backend, counts=counts
+                )
+                with path.open("rb") as handle:
+                    _fold_spine_reversed(handle, fold, reverse_symbols)
+            elif checkpoint_path is not None:
+                # Strict folds keep their own checkpoint kind so they never resume prefiltered state.
+                kind = "spine-strict" if strict else "spine"
+                fold = _fold_resumable(path, checkpoint_path, kind, _make_fold)
+            else:
+                fold = _make_fold()
+                with path.open("rb") as handle:
+                    _fold_file(handle, fold)
+        except _NotMappable:
+            # Every mode computes the same summary as a plain front-to-back fold.
+            fold = _make_fold()
+            with path.open("rb") as handle:
+                _fold_file(handle, fold)
+    except OSError:
+        return {}
+    return fold.summary()
+
+
+class _IntentFold:
+    """Latest router intent per symbol, folded line by line."""
+
+    __slots__ = ("latest_intent_by_symbol", "json_backend", "cutoff", "touched", "counts")
+
+    def __init__(
+        self, json_backend: str = "stdlib", cutoff: str | None = None, counts: Counter | None = None
+    ) -> None:
+        self.latest_intent_by_symbol: Dict[str, _IntentRecord] = {}
+        self.json_backend = json_backend
+        self.cutoff = cutoff
+        # When set, ("intent", symbol) is added for every replaced intent.
+        self.touched: set[tuple[str, str]] | None = None
+        self.counts = counts
+
+    @property
+    def record_literal(self) -> bytes | None:
+        # Every intent record is relevant; there is nothing to prefilter on.
+        return None
+
+    def feed(self, lines: Iterable[bytes]) -> None:
+        self.feed_events(self._decode(lines))
+
+    def _decode(self, lines: Iterable[bytes]) -> Iterator[Any]:
+        loads = _JSON_BACKENDS[self.json_backend]
+        retry = self.json_backend != "stdlib"
+        widens = self.json_backend in _WIDENING_BACKENDS
+        counts = self.counts
+        if counts is not None:
+            lines, loads = _counted_lines(lines, counts), _timed_loads(loads, counts)
+        for line in lines:
+            if not line.strip():
+                if counts is not None:
+                    counts["rejected_blank"] += 1
+                continue
+            try:
+                event = loads(line)
+            except ValueError:
+                event = _reference_loads(line) if retry else _UNDECODABLE
+                if event is _UNDECODABLE:
+                    if counts is not None:
+                        counts["rejected_bad_json"] += 1
                     continue
-                latest_ts_by_symbol[symbol] = timestamp
-                latest_intent_by_symbol[symbol] = {
-                    "direction": intent.get("direction"),
-                    "size_pct": intent.get("size_pct"),
-                    "risk_cap": intent.get("risk_cap"),
-                    "rationale": intent.get("rationale"),
-                }
+            else:
+                if widens and type(event) is dict:
+                    intent = event.get("payload")
+                    if type(intent) is not dict:
+                        intent = event.get("intent")
+                    if type(intent) is dict and (
+                        _widened(intent.get("size_pct"))
+                        or _widened(intent.get("risk_cap"))
+                        or _widened(intent.get("rationale"))
+                    ):
+                        event = _stdlib_loads(line)
+            yield event
+
+    def feed_events(self, records: Iterable[Any]) -> None:
+        latest_intent_by_symbol = self.latest_intent_by_symbol
+        cutoff_key = None if self.cutoff is None else _ts_key(self.cutoff)
+        touched = self.touched
+        counts = self.counts
+        for record in records:
+            if not isinstance(record, dict):
+                if counts is not None:
+                    counts["rejected_non_dict"] += 1
+                continue
+            intent = record.get("payload")
+            if not isinstance(intent, dict):
+                intent = record.get("intent")
+            if not isinstance(intent, dict):
+                if counts is not None:
+                    counts["rejected_payload"] += 1
+                continue
+            symbol = record.get("symbol")
+            if not isinstance(symbol, str):
+                symbol = intent.get("symbol")
+            if not isinstance(symbol, str):
+                if counts is not None:
+                    counts["rejected_symbol"] += 1
+                continue
+            timestamp = record.get("timestamp")
+            current = latest_intent_by_symbol.get(symbol)
+            if (
+                counts is None
+                and current is not None
+                and type(timestamp) is str
+                and timestamp < current.timestamp
+                and _same_layout(timestamp, current.timestamp)
+            ):
+                # Older than the current record: drop it unparsed. Only the rejection
+                # counts could tell an invalid stamp dropped here from one _ts_key rejects.
+                continue
+            ts_key = _ts_key(timestamp)
+            if ts_key is None:
+                if counts is not None:
+                    counts["rejected_timestamp"] += 1
+                continue
+            if cutoff_key is not None and ts_key > cutoff_key:
+                if counts is not None:
+                    counts["rejected_after_cutoff"] += 1
+                continue
+            if counts is not None:
+                counts["records_folded"] += 1
+            if current is not None and ts_key <= current.ts_key:
+                continue
+            latest_intent_by_symbol[sys.intern(symbol)] = _IntentRecord.from_dict(timestamp, intent, ts_key)
+            if touched is not None:
+                touched.add(("intent", symbol))
+
+    def summary(self) -> Dict[str, _IntentRecord]:
+        return self.latest_intent_by_symbol
+
+    def merge(self, later: "_IntentFold") -> None:
+        """Fold in the result of a fold over records that come after this one's in the file."""
+        for symbol, record in later.latest_intent_by_symbol.items():
+            current = self.latest_intent_by_symbol.get(symbol)
+            if current is not None and record.ts_key <= current.ts_key:
+                continue
+            self.latest_intent_by_symbol[symbol] = record
+        if self.counts is not None and later.counts is not None:
+            self.counts.update(later.counts)
+
+    def dump_state(self) -> Dict[str, Any]:
+        intents = self.latest_intent_by_symbol
+        return {
+            "latest_intent_by_symbol": {symbol: record.as_dict() for symbol, record in intents.items()},
+            "latest_ts_by_symbol": {symbol: record.timestamp for symbol, record in intents.items()},
+        }
+
+    def load_state(self, state: Any) -> None:
+        intents = state["latest_intent_by_symbol"]
+        timestamps = state["latest_ts_by_symbol"]
+        if not isinstance(intents, dict) or not isinstance(timestamps, dict):
+            raise ValueError("checkpoint state is not a mapping")
+        if intents.keys() != timestamps.keys():
+            raise ValueError("checkpoint intents and timestamps disagree")
+        for symbol, intent in intents.items():
+            if not isinstance(intent, dict) or not _is_valid_ts(timestamps[symbol]):
+                raise ValueError(f"checkpoint entry for {symbol!r} is malformed")
+        self.latest_intent_by_symbol = {
+            sys.intern(symbol): _IntentRecord.from_dict(timestamps[symbol], intent)
+            for symbol, intent in intents.items()
+        }
+
+
+def _parse_router_intents(
+    path: Path,
+    *,
+    checkpoint_path: Path | None = None,
+    json_backend: str = "stdlib",
+    as_of: str | None = None,
+    counts: Counter | None = None,
+) -> Dict[str, _IntentRecord]:
+    def _make_fold() -> _IntentFold:
+        return _IntentFold(json_backend=json_backend, cutoff=as_of, counts=counts)
+
+    try:
+        try:
+            if checkpoint_path is not None and _is_regular_file(path):
+                fold = _fold_resumable(path, checkpoint_path, "intents", _make_fold)
+            else:
+                fold = _make_fold()
+                with path.open("rb") as handle:
+                    _fold_file(handle, fold)
+        except _NotMappable:
+            fold = _make_fold()
+            with path.open("rb") as handle:
+                _fold_file(handle, fold)
     except OSError:
         return {}
-    return latest_intent_by_symbol
+    return fold.summary()
+
+
+def _select_symbols(
+    spine_summary: Dict[str, Dict[str, Any]],
+    intent_summary: Dict[str, _IntentRecord],
+    wanted: Iterable[str] | None = None,
+) -> list[str]:
+    symbols = sorted(set(spine_summary.keys()) | set(intent_summary.keys()))
+    if wanted is not None:
+        wanted = set(wanted)
+        symbols = [symbol for symbol in symbols if symbol in wanted]
+    return symbols
+
+
+def _inputs_header_ts(
+    symbols: list[str],
+    spine_summary: Dict[str, Dict[str, Any]],
+    intent_summary: Dict[str, _IntentRecord],
+) -> str:
+    """Latest timestamp among the records behind the rendered symbols ("—" when none)."""
+    latest = None
+    for symbol in symbols:
+        records = list(spine_summary.get(symbol, {}).values())
+        records.append(intent_summary.get(symbol))
+        for record in records:
+            if record is not None and (latest is None or record.ts_key > latest.ts_key):
+                latest = record
+    return "—" if latest is None else latest.timestamp
 
 
 def _build_snapshot_entries(
     symbols: list[str],
-    spine_summary: Dict[str, Dict[str, Dict[str, Any]]],
-    intent_summary: Dict[str, Dict[str, Any]],
+    spine_summary: Dict[str, Dict[str, Any]],
+    intent_summary: Dict[str, _IntentRecord],
 ) -> list[Dict[str, Any]]:
     # The only place snapshot data is assembled; renderers must not diverge semantics.
     entries: list[Dict[str, Any]] = []
@@ -152,22 +1557,22 @@ def _build_snapshot_entries(
         change_entry = spine_summary.get(symbol, {}).get("market.regime_change")
         intent_entry = intent_summary.get(symbol)
 
-        regime = regime_entry.get("regime") if isinstance(regime_entry, dict) else "—"
-        regime_ts = regime_entry.get("timestamp") if isinstance(regime_entry, dict) else "—"
-        change_from = change_entry.get("from") if isinstance(change_entry, dict) else None
-        change_to = change_entry.get("to") if isinstance(change_entry, dict) else None
-        change_ts = change_entry.get("timestamp") if isinstance(change_entry, dict) else "—"
+        regime = regime_entry.regime if regime_entry is not None else "—"
+        regime_ts = regime_entry.timestamp if regime_entry is not None else "—"
+        change_from = change_entry.from_regime if change_entry is not None else None
+        change_to = change_entry.to_regime if change_entry is not None else None
+        change_ts = change_entry.timestamp if change_entry is not None else "—"
 
         if change_from is not None and change_to is not None:
             change_value = f"{change_from} -> {change_to} @ {change_ts}"
         else:
             change_value = "—"
 
-        if isinstance(intent_entry, dict):
-            direction = intent_entry.get("direction", "—")
-            size_pct = intent_entry.get("size_pct", "—")
-            risk_cap = intent_entry.get("risk_cap", "—")
-            rationale = intent_entry.get("rationale")
+        if intent_entry is not None:
+            direction = intent_entry.direction
+            size_pct = intent_entry.size_pct
+            risk_cap = intent_entry.risk_cap
+            rationale = intent_entry.rationale
         else:
             direction = "—"
             size_pct = "—"
@@ -189,114 +1594,1696 @@ def _build_snapshot_entries(
     return entries
 
 
-def _render_markdown(header_ts: str, entries: list[Dict[str, Any]]) -> None:
+def _render_markdown_section(entry: Dict[str, Any]) -> str:
+    # Formatting only; one symbol's block, newline-terminated.
+    lines = [
+        f"## {entry['symbol']}",
+        "",
+        f"- **regime:** {entry['regime']} @ {entry['regime_ts']}",
+        f"- **last regime change:** {entry['change_value']}",
+        f"- **posture:** {entry['direction']} / {entry['risk_cap']} / size={entry['size_pct']}",
+        "",
+        "**rationale:**",
+    ]
+    rationale = entry.get("rationale")
+    if isinstance(rationale, list) and rationale:
+        for line in rationale:
+            lines.append(f"- {line}")
+    else:
+        lines.append("- —")
+    lines.append("")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _render_markdown(
+    header_ts: str,
+    entries: list[Dict[str, Any]],
+    section: Callable[[Dict[str, Any]], str] = _render_markdown_section,
+) -> str:
     # Formatting only; no logic or ordering changes.
-    print(f"# synthdesk snapshot (utc): {header_ts}")
-    print("")
-    for entry in entries:
-        print(f"## {entry['symbol']}")
-        print("")
-        print(f"- **regime:** {entry['regime']} @ {entry['regime_ts']}")
-        print(f"- **last regime change:** {entry['change_value']}")
-        print(
-            f"- **posture:** {entry['direction']} / {entry['risk_cap']} / size={entry['size_pct']}"
-        )
-        print("")
-        print("**rationale:**")
-        rationale = entry.get("rationale")
-        if isinstance(rationale, list) and rationale:
-            for line in rationale:
-                print(f"- {line}")
-        else:
-            print("- —")
-        print("")
+    parts = [f"# synthdesk snapshot (utc): {header_ts}\n\n"]
+    parts.extend(map(section, entries))
+    return "".join(parts)
 
 
-def _render_terminal(header_ts: str, entries: list[Dict[str, Any]]) -> None:
+def _render_terminal_section(entry: Dict[str, Any]) -> str:
+    # Formatting only; one symbol's block, newline-terminated.
+    lines = [
+        entry["symbol"],
+        f"regime: {entry['regime']} @ {entry['regime_ts']}",
+        f"last regime change: {entry['change_value']}",
+        f"posture: {entry['direction']} / {entry['risk_cap']} / size={entry['size_pct']}",
+        "rationale:",
+    ]
+    rationale = entry.get("rationale")
+    if isinstance(rationale, list) and rationale:
+        for line in rationale:
+            lines.append(f"- {line}")
+    else:
+        lines.append("- —")
+    lines.append("")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _render_terminal(
+    header_ts: str,
+    entries: list[Dict[str, Any]],
+    section: Callable[[Dict[str, Any]], str] = _render_terminal_section,
+) -> str:
     # Formatting only; no logic or ordering changes.
-    print(f"synthdesk snapshot (utc): {header_ts}")
-    print("")
-    for entry in entries:
-        print(entry["symbol"])
-        print(f"regime: {entry['regime']} @ {entry['regime_ts']}")
-        print(f"last regime change: {entry['change_value']}")
-        print(
-            f"posture: {entry['direction']} / {entry['risk_cap']} / size={entry['size_pct']}"
-        )
-        print("rationale:")
-        rationale = entry.get("rationale")
-        if isinstance(rationale, list) and rationale:
-            for line in rationale:
-                print(f"- {line}")
-        else:
-            print("- —")
-        print("")
+    parts = [f"synthdesk snapshot (utc): {header_ts}\n\n"]
+    parts.extend(map(section, entries))
+    return "".join(parts)
+
+
+def _escape_html(value: Any) -> str:
+    return html.escape(str(value), quote=True)
+
 
+def _render_html_section(entry: Dict[str, Any]) -> str:
+    # Formatting only; one symbol's <section>, newline-terminated.
+    lines = [
+        "  <section>",
+        f"    <h2>{_escape_html(entry['symbol'])}</h2>",
+        "    <ul>",
+        f"      <li><strong>regime:</strong> {_escape_html(entry['regime'])} @ "
+        f"{_escape_html(entry['regime_ts'])}</li>",
+        f"      <li><strong>last regime change:</strong> {_escape_html(entry['change_value'])}</li>",
+        f"      <li><strong>posture:</strong> {_escape_html(entry['direction'])} / "
+        f"{_escape_html(entry['risk_cap'])} / size={_escape_html(entry['size_pct'])}</li>",
+        "    </ul>",
+        "",
+        "    <strong>rationale:</strong>",
+        "    <ul>",
+    ]
+    rationale = entry.get("rationale")
+    if isinstance(rationale, list) and rationale:
+        for line in rationale:
+            lines.append(f"      <li>{_escape_html(line)}</li>")
+    else:
+        lines.append("      <li>—</li>")
+    lines.append("    </ul>")
+    lines.append("  </section>")
+    lines.append("")
+    return "\n".join(lines)
 
-def _render_html(header_ts: str, entries: list[Dict[str, Any]]) -> None:
+
+# Patches the served page in place from /events: each event replaces, inserts (in
+# symbol order) or removes one <section>, matched by its <h2> text.
+_LIVE_PATCH_SCRIPT = """  <script>
+    new EventSource("{events_url}").addEventListener("entry", function (event) {{
+      var update = JSON.parse(event.data);
+      document.querySelector("h1").textContent = "synthdesk snapshot (utc): " + update.header_ts;
+      var sections = document.querySelectorAll("body > section");
+      var current = null;
+      var next = null;
+      for (var i = 0; i < sections.length; i++) {{
+        var name = sections[i].querySelector("h2").textContent;
+        if (name === update.symbol) {{ current = sections[i]; break; }}
+        if (name > update.symbol) {{ next = sections[i]; break; }}
+      }}
+      if (update.html === null) {{ if (current) current.remove(); return; }}
+      var holder = document.createElement("div");
+      holder.innerHTML = update.html;
+      var section = holder.firstElementChild;
+      if (current) current.replaceWith(section);
+      else if (next) next.before(section);
+      else document.body.insertBefore(section, document.querySelector("body > script"));
+    }});
+  </script>"""
+
+
+def _render_html(
+    header_ts: str,
+    entries: list[Dict[str, Any]],
+    events_url: str | None = None,
+    section: Callable[[Dict[str, Any]], str] = _render_html_section,
+) -> str:
     # Formatting only; no logic or ordering changes.
-    def _escape(value: Any) -> str:
-        return html.escape(str(value), quote=True)
-
-    print("<!doctype html>")
-    print('<html lang="en">')
-    print("<head>")
-    print('  <meta charset="utf-8">')
-    print("  <title>synthdesk snapshot</title>")
-    print("</head>")
-    print("<body>")
-    print(f"  <h1>synthdesk snapshot (utc): {_escape(header_ts)}</h1>")
-    print("")
-    for entry in entries:
-        print("  <section>")
-        print(f"    <h2>{_escape(entry['symbol'])}</h2>")
-        print("    <ul>")
-        print(
-            f"      <li><strong>regime:</strong> {_escape(entry['regime'])} @ {_escape(entry['regime_ts'])}</li>"
+    parts = [
+        "<!doctype html>\n"
+        '<html lang="en">\n'
+        "<head>\n"
+        '  <meta charset="utf-8">\n'
+        "  <title>synthdesk snapshot</title>\n"
+        "</head>\n"
+        "<body>\n"
+        f"  <h1>synthdesk snapshot (utc): {_escape_html(header_ts)}</h1>\n\n"
+    ]
+    parts.extend(map(section, entries))
+    if events_url is not None:
+        parts.append(_LIVE_PATCH_SCRIPT.format(events_url=_escape_html(events_url)) + "\n")
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+
+def _render_json(header_ts: str, entries: list[Dict[str, Any]]) -> str:
+    # Formatting only; no logic or ordering changes.
+    return json.dumps({"header_ts": header_ts, "entries": entries}, ensure_ascii=False, indent=2) + "\n"
+
+
+_SECTION_RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "markdown": _render_markdown_section,
+    "html": _render_html_section,
+    "terminal": _render_terminal_section,
+}
+
+
+class _FragmentCache:
+    """Rendered per-symbol sections, reused while a symbol's entry dict is the same object.
+
+    For follow and serve, whose _LiveSnapshot replaces an entry dict only when the
+    entry changes: a re-render formats only those symbols and copies every other
+    section. One slot per (output mode, symbol), so memory is bounded by the
+    symbol universe.
+    """
+
+    def __init__(self) -> None:
+        self._fragments: Dict[tuple[str, str], tuple[Dict[str, Any], str]] = {}
+
+    def section(self, output_mode: str, entry: Dict[str, Any]) -> str:
+        # Identity, not equality: comparing values costs about as much as formatting,
+        # and 1 == 1.0 although they render differently. The slot keeps the entry
+        # alive, so its identity cannot be reused by another dict.
+        slot = (output_mode, entry["symbol"])
+        cached = self._fragments.get(slot)
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+        text = _SECTION_RENDERERS[output_mode](entry)
+        self._fragments[slot] = (entry, text)
+        return text
+
+    def renderer(self, output_mode: str) -> Callable[[Dict[str, Any]], str]:
+        return lambda entry: self.section(output_mode, entry)
+
+
+def _render_to_text(
+    output_mode: str | None,
+    header_ts: str,
+    entries: list[Dict[str, Any]],
+    events_url: str | None = None,
+    fragments: _FragmentCache | None = None,
+) -> str:
+    if output_mode == "json":
+        return _render_json(header_ts, entries)
+    mode = output_mode if output_mode in _SECTION_RENDERERS else "terminal"
+    section = _SECTION_RENDERERS[mode] if fragments is None else fragments.renderer(mode)
+    if mode == "markdown":
+        return _render_markdown(header_ts, entries, section)
+    if mode == "html":
+        return _render_html(header_ts, entries, events_url, section)
+    return _render_terminal(header_ts, entries, section)
+
+
+def _render(
+    output_mode: str | None,
+    header_ts: str,
+    entries: list[Dict[str, Any]],
+    events_url: str | None = None,
+    fragments: _FragmentCache | None = None,
+) -> None:
+    # Built in memory and written once; per-line print() calls dominated large renders.
+    sys.stdout.write(_render_to_text(output_mode, header_ts, entries, events_url, fragments))
+
+
+_OUTPUT_SUFFIXES = {"markdown": ".md", "html": ".html", "json": ".json"}
+
+
+class SnapshotEngine:
+    """The snapshot pipeline in-process: fold state fed line by line, entries and renders on demand.
+
+    Lines are complete JSONL records (bytes or str, with or without the newline),
+    fed in file order; any batching gives the same entries as parsing the whole
+    file with the CLI. Entry dicts are shared with later calls and must not be
+    modified. Not thread-safe.
+
+        engine = SnapshotEngine()
+        engine.feed_spine_lines(spine_lines)
+        engine.feed_intent_lines(intent_lines)
+        text = engine.render("html")
+    """
+
+    def __init__(
+        self,
+        *,
+        symbols: Iterable[str] | None = None,
+        strict: bool = False,
+        json_backend: str = "auto",
+        as_of: str | None = None,
+    ) -> None:
+        if as_of is not None and not _is_valid_ts(as_of):
+            raise ValueError(f"expected an ISO-8601 UTC timestamp, got {as_of!r}")
+        backend = _resolve_json_backend(json_backend)
+        self.symbols = None if symbols is None else list(symbols)
+        self._wanted = None if symbols is None else set(self.symbols)
+        self.as_of = as_of
+        self._spine = _SpineFold(prefilter=not strict, json_backend=backend, cutoff=as_of)
+        self._intents = _IntentFold(json_backend=backend, cutoff=as_of)
+        # A symbol's dict is replaced only when a feed touches it, so renders reuse the
+        # fragments of everything else. _stale is None when every symbol must be rebuilt.
+        self._entries_by_symbol: Dict[str, Dict[str, Any]] = {}
+        self._stale: set[str] | None = None
+        self._fragments = _FragmentCache()
+
+    def feed_spine_lines(self, lines: Iterable[bytes | str]) -> set[str]:
+        """Fold spine records; return the symbols whose latest regime or regime change was replaced."""
+        return self._feed(self._spine, lines)
+
+    def feed_intent_lines(self, lines: Iterable[bytes | str]) -> set[str]:
+        """Fold router intent records; return the symbols whose latest intent was replaced."""
+        return self._feed(self._intents, lines)
+
+    def reset_spine(self) -> None:
+        """Forget all spine records, e.g. after the spine was rotated or rewritten."""
+        self._spine = _SpineFold(
+            prefilter=self._spine.prefilter, json_backend=self._spine.json_backend, cutoff=self.as_of
+        )
+        self._stale = None
+
+    def reset_intents(self) -> None:
+        """Forget all router intent records."""
+        self._intents = _IntentFold(json_backend=self._intents.json_backend, cutoff=self.as_of)
+        self._stale = None
+
+    def _feed(self, fold: Any, lines: Iterable[bytes | str]) -> set[str]:
+        touched: set[tuple[str, str]] = set()
+        fold.touched = touched
+        try:
+            fold.feed(line.encode("utf-8") if isinstance(line, str) else line for line in lines)
+        finally:
+            fold.touched = None
+            if self._stale is not None:
+                self._stale.update(symbol for _, symbol in touched)
+        return {symbol for _, symbol in touched}
+
+    def _refresh(self) -> None:
+        stale, self._stale = self._stale, set()
+        if stale is None:
+            stale = (
+                set(self._spine.latest_regime_by_symbol)
+                | set(self._intents.latest_intent_by_symbol)
+                | set(self._entries_by_symbol)
+            )
+        for symbol in stale:
+            if self._wanted is not None and symbol not in self._wanted:
+                continue
+            # Replaced even when equal: 1 == 1.0, but they render differently.
+            entry = _symbol_entry(symbol, self._spine, self._intents)
+            if entry is None:
+                self._entries_by_symbol.pop(symbol, None)
+            else:
+                self._entries_by_symbol[symbol] = entry
+
+    def entry(self, symbol: str) -> Dict[str, Any] | None:
+        """The entry entries() would list for symbol, or None when it has none."""
+        if self._wanted is not None and symbol not in self._wanted:
+            return None
+        self._refresh()
+        return self._entries_by_symbol.get(symbol)
+
+    def entries(self) -> list[Dict[str, Any]]:
+        self._refresh()
+        return [self._entries_by_symbol[symbol] for symbol in sorted(self._entries_by_symbol)]
+
+    def render(self, output_mode: str | None = None, header_ts: str | None = None) -> str:
+        """Render the current entries; header_ts defaults to as_of, else the current time."""
+        if header_ts is None:
+            header_ts = self.as_of if self.as_of is not None else datetime.now(timezone.utc).isoformat()
+        return _render_to_text(output_mode, header_ts, self.entries(), fragments=self._fragments)
+
+
+# Lines folded between yields to the event loop.
+_ASYNC_FOLD_LINES = 4096
+
+
+async def tail_lines(path: Path, *, poll_interval: float = 0.5) -> AsyncIterator[list[bytes] | None]:
+    """Yield batches of complete lines from an append-only file, following it forever.
+
+    The first pass, and every later one that yields anything, ends with an empty
+    batch once it has reached the end of the file. None is yielded when the file disappears, is
+    truncated or is rewritten (same checks as _FoldTailer); batches after it
+    start again from byte 0. An unterminated final line is held back until its
+    newline arrives. Reads are bounded to _MAP_BLOCK_BYTES and the loop is never
+    blocked waiting for data, so many tails can share one event loop.
+    """
+    source: Dict[str, Any] | None = None
+    first = True
+    while True:
+        try:
+            handle = path.open("rb")
+        except FileNotFoundError:
+            if source is not None:
+                source = None
+                yield None
+                yield []
+            elif first:
+                yield []
+            first = False
+            await asyncio.sleep(poll_interval)
+            continue
+        with handle:
+            stat = os.fstat(handle.fileno())
+            offset = _resume_offset(handle, stat, source)
+            yielded = offset is None
+            if offset is None:
+                source = None
+                offset = 0
+                yield None
+            consumed = offset
+            pending = b""
+            handle.seek(offset)
+            while offset < stat.st_size:
+                block = handle.read(min(_MAP_BLOCK_BYTES, stat.st_size - offset))
+                if not block:
+                    break
+                offset += len(block)
+                pending += block
+                last_newline = pending.rfind(b"\n")
+                if last_newline < 0:
+                    continue
+                lines = pending[:last_newline].split(b"\n")
+                consumed += last_newline + 1
+                pending = pending[last_newline + 1 :]
+                yielded = True
+                yield lines
+                await asyncio.sleep(0)
+            if source is None or consumed != source["offset"]:
+                source = _source_fingerprint(handle, stat, consumed)
+            if yielded or first:
+                yield []
+        first = False
+        await asyncio.sleep(poll_interval)
+
+
+class AsyncSnapshot:
+    """A SnapshotEngine kept current from an asyncio loop by tailing a spine and an intents file.
+
+    run() folds both files as they grow, in slices of _ASYNC_FOLD_LINES lines with
+    a yield to the loop in between; changes_since() wakes waiters when rendered
+    entries change. One instance per desk; gather their run() calls to watch
+    several desks from one thread.
+    """
+
+    def __init__(
+        self,
+        spine_path: Path,
+        intents_path: Path,
+        *,
+        poll_interval: float = 0.5,
+        symbols: Iterable[str] | None = None,
+        strict: bool = False,
+        json_backend: str = "auto",
+    ) -> None:
+        self.engine = SnapshotEngine(symbols=symbols, strict=strict, json_backend=json_backend)
+        self.paths = [Path(spine_path), Path(intents_path)]
+        self.poll_interval = poll_interval
+        self.version = 0
+        self.symbol_versions: Dict[str, int] = {}
+        self.entries_by_symbol: Dict[str, Dict[str, Any]] = {}
+        self._fragments = _FragmentCache()
+        # Symbols fed since the last publish, and inputs between a reset and the end
+        # of their refold; nothing is published while a refold is under way.
+        self._touched: set[str] = set()
+        self._refolding = 0
+        # Created on first use so it belongs to the loop that awaits it.
+        self._changed: asyncio.Condition | None = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    async def run(self) -> None:
+        """Tail both inputs until cancelled."""
+        spine_path, intents_path = self.paths
+        # Both initial folds count as refolds: the first publish has both inputs.
+        self._refolding = 2
+        await asyncio.gather(
+            self._follow(spine_path, self.engine.feed_spine_lines, self.engine.reset_spine),
+            self._follow(intents_path, self.engine.feed_intent_lines, self.engine.reset_intents),
+        )
+
+    async def _follow(
+        self, path: Path, feed: Callable[[Iterable[bytes]], set[str]], reset: Callable[[], None]
+    ) -> None:
+        # Publish once per tail pass, so waiters only see states where the input was
+        # folded up to its end, never the intermediate ones of a catch-up or refold.
+        refolding = True
+        async for lines in tail_lines(path, poll_interval=self.poll_interval):
+            if lines is None:
+                reset()
+                self._touched |= set(self.entries_by_symbol)
+                if not refolding:
+                    refolding = True
+                    self._refolding += 1
+            elif lines:
+                for start in range(0, len(lines), _ASYNC_FOLD_LINES):
+                    self._touched |= feed(lines[start : start + _ASYNC_FOLD_LINES])
+                    await asyncio.sleep(0)
+            else:
+                if refolding:
+                    refolding = False
+                    self._refolding -= 1
+                if not self._refolding:
+                    touched, self._touched = self._touched, set()
+                    await self._publish(touched)
+
+    async def _publish(self, touched: set[str]) -> None:
+        # Same per-symbol diff as _LiveSnapshot.poll.
+        changed = []
+        for symbol in touched:
+            entry = self.engine.entry(symbol)
+            if entry == self.entries_by_symbol.get(symbol):
+                continue
+            changed.append(symbol)
+            if entry is None:
+                del self.entries_by_symbol[symbol]
+            else:
+                self.entries_by_symbol[symbol] = entry
+        if not changed:
+            return
+        condition = self._condition()
+        async with condition:
+            self.version += 1
+            for symbol in changed:
+                self.symbol_versions[symbol] = self.version
+            condition.notify_all()
+
+    async def changes_since(self, version: int) -> tuple[int, set[str]]:
+        """Wait until entries change after `version`; return the new version and the changed symbols."""
+        condition = self._condition()
+        async with condition:
+            await condition.wait_for(lambda: self.version > version)
+            return self.version, {
+                symbol for symbol, changed_at in self.symbol_versions.items() if changed_at > version
+            }
+
+    def entries(self) -> list[Dict[str, Any]]:
+        return [self.entries_by_symbol[symbol] for symbol in sorted(self.entries_by_symbol)]
+
+    def render(self, output_mode: str | None = None, header_ts: str | None = None) -> str:
+        """Render the published entries; header_ts defaults to the current time."""
+        if header_ts is None:
+            header_ts = datetime.now(timezone.utc).isoformat()
+        return _render_to_text(output_mode, header_ts, self.entries(), fragments=self._fragments)
+
+
+def _sweep_buckets(path: Path, cutoffs: list[str], make_fold: Callable[[], Any]) -> list[Any]:
+    """Fold each record into the bucket of the first cutoff at or after its timestamp.
+
+    One pass over the file. Records equal in timestamp land in the same bucket in
+    file order, so merging buckets 0..k reproduces an as-of fold at cutoffs[k].
+    """
+    buckets = [make_fold() for _ in cutoffs]
+    cutoff_keys = [_ts_key(cutoff) for cutoff in cutoffs]
+    with path.open("rb") as handle:
+        router = buckets[0]
+        for record in router._decode(_iter_file_lines(handle, router.record_literal, None)):
+            if not isinstance(record, dict):
+                continue
+            ts_key = _ts_key(record.get("timestamp"))
+            if ts_key is None:
+                continue
+            bucket = bisect.bisect_left(cutoff_keys, ts_key)
+            if bucket < len(buckets):
+                buckets[bucket].feed_events((record,))
+    return buckets
+
+
+def _sweep_snapshots(
+    spine_path: Path,
+    intents_path: Path,
+    cutoffs: list[str],
+    out_dir: Path,
+    output_mode: str | None,
+    wanted: Iterable[str] | None,
+    strict: bool,
+    json_backend: str,
+) -> None:
+    """Render an as-of snapshot for every cutoff from one pass over each input.
+
+    Each snapshot is written to out_dir under the sha256 of its content; manifest.json
+    maps cutoffs to file names and is replaced last.
+    """
+    cutoffs = sorted(set(cutoffs), key=_ts_key)
+    spine_buckets = _sweep_buckets(
+        spine_path, cutoffs, lambda: _SpineFold(prefilter=not strict, json_backend=json_backend)
+    )
+    intent_buckets = (
+        _sweep_buckets(intents_path, cutoffs, lambda: _IntentFold(json_backend=json_backend))
+        if intents_path.exists()
+        else [_IntentFold(json_backend=json_backend) for _ in cutoffs]
+    )
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = _OUTPUT_SUFFIXES.get(output_mode or "", ".txt")
+    spine_fold = _SpineFold()
+    intent_fold = _IntentFold()
+    manifest = []
+    for cutoff, spine_bucket, intent_bucket in zip(cutoffs, spine_buckets, intent_buckets):
+        spine_fold.merge(spine_bucket)
+        intent_fold.merge(intent_bucket)
+        spine_summary = spine_fold.summary()
+        intent_summary = intent_fold.summary()
+        symbols = _select_symbols(spine_summary, intent_summary, wanted)
+        entries = _build_snapshot_entries(symbols, spine_summary, intent_summary)
+        text = _render_to_text(output_mode, cutoff, entries)
+        name = hashlib.sha256(text.encode("utf-8")).hexdigest() + suffix
+        if not (out_dir / name).exists():
+            _atomic_write_text(out_dir / name, text)
+        manifest.append({"as_of": cutoff, "file": name})
+    _atomic_write_text(out_dir / "manifest.json", json.dumps({"snapshots": manifest}, indent=2) + "\n")
+
+
+class _FoldTailer:
+    """Keep a fold current with an append-only file by consuming records as they are completed.
+
+    Unlike a one-shot parse, an unterminated final line is left alone until its
+    newline arrives. Truncation, rotation or rewrite (inode, size or prefix hash
+    change) discards the fold and refolds the file from byte 0.
+    """
+
+    __slots__ = ("path", "make_fold", "fold", "source")
+
+    def __init__(self, path: Path, make_fold: Callable[[], Any]) -> None:
+        self.path = path
+        self.make_fold = make_fold
+        self.fold = make_fold()
+        self.source: Dict[str, Any] | None = None
+
+    def poll(self) -> set[str] | None:
+        """Consume newly completed records; return the symbols they touched, or None after a refold."""
+        try:
+            handle = self.path.open("rb")
+        except FileNotFoundError:
+            if self.source is None:
+                return set()
+            self.fold = self.make_fold()
+            self.source = None
+            return None
+        with handle:
+            stat = os.fstat(handle.fileno())
+            offset = _resume_offset(handle, stat, self.source)
+            refold = offset is None
+            if offset is None:
+                self.fold = self.make_fold()
+                offset = 0
+            elif self.source is not None and offset == stat.st_size:
+                return set()
+            touched: set[tuple[str, str]] = set()
+            self.fold.touched = touched
+            consumed = offset
+            literal = self.fold.record_literal
+            try:
+                # Bounded reads rather than a mapping: a copytruncate rotation shrinking the
+                # file under a mapping would kill the process with SIGBUS, while a read just
+                # comes up short and the next poll sees the truncation.
+                handle.seek(offset)
+                for block in _read_line_blocks(handle, stat.st_size - offset):
+                    if not block.endswith(b"\n"):
+                        break
+                    consumed += len(block)
+                    lines = block[:-1].split(b"\n")
+                    self.fold.feed(lines if literal is None else [line for line in lines if literal in line])
+            finally:
+                self.fold.touched = None
+            self.source = _source_fingerprint(handle, stat, consumed)
+        if refold:
+            return None
+        return {symbol for _, symbol in touched}
+
+
+class _InotifyWatcher:
+    """Block until something changes in the directories holding the followed files."""
+
+    _IN_MODIFY = 0x002
+    _IN_ATTRIB = 0x004
+    _IN_CLOSE_WRITE = 0x008
+    _IN_MOVED_TO = 0x080
+    _IN_CREATE = 0x100
+    _IN_DELETE = 0x200
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = (
+            self._IN_MODIFY
+            | self._IN_ATTRIB
+            | self._IN_CLOSE_WRITE
+            | self._IN_MOVED_TO
+            | self._IN_CREATE
+            | self._IN_DELETE
+        )
+        # Watching directories rather than files survives rotation and late creation.
+        for directory in {path.resolve().parent for path in paths}:
+            if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> None:
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not readable:
+            return
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingWatcher:
+    """Fallback for platforms without inotify: wake up every interval."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(max(0.0, min(timeout, self._interval)))
+
+    def close(self) -> None:
+        pass
+
+
+def _make_watcher(paths: Iterable[Path], poll_interval: float, force_polling: bool) -> Any:
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return _InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return _PollingWatcher(poll_interval)
+
+
+def _symbol_entry(
+    symbol: str, spine_fold: _SpineFold, intent_fold: _IntentFold
+) -> Dict[str, Any] | None:
+    # The per-symbol slice of _select_symbols + _build_snapshot_entries.
+    spine_entry = spine_fold.symbol_summary(symbol)
+    intent_entry = intent_fold.latest_intent_by_symbol.get(symbol)
+    if spine_entry is None and intent_entry is None:
+        return None
+    spine_summary = {symbol: spine_entry} if spine_entry is not None else {}
+    intent_summary = {symbol: intent_entry} if intent_entry is not None else {}
+    return _build_snapshot_entries([symbol], spine_summary, intent_summary)[0]
+
+
+class _LiveSnapshot:
+    """Snapshot entries kept current by tailing both inputs; shared by follow and serve."""
+
+    def __init__(
+        self,
+        spine_path: Path,
+        intents_path: Path,
+        wanted: Iterable[str] | None,
+        strict: bool,
+        json_backend: str,
+    ) -> None:
+        self.wanted = None if wanted is None else set(wanted)
+        self.spine = _FoldTailer(
+            spine_path, lambda: _SpineFold(prefilter=not strict, json_backend=json_backend)
+        )
+        self.intents = _FoldTailer(intents_path, lambda: _IntentFold(json_backend=json_backend))
+        self.entries_by_symbol: Dict[str, Dict[str, Any]] = {}
+        self.paths = [spine_path, intents_path]
+        # Set while a poll is under way: if a tailer raises, the symbols it had already
+        # folded were never reported, so the next poll re-checks every symbol.
+        self._resync = False
+
+    def _all_symbols(self) -> set[str]:
+        return (
+            set(self.spine.fold.latest_regime_by_symbol)
+            | set(self.intents.fold.latest_intent_by_symbol)
+            | set(self.entries_by_symbol)
+        )
+
+    def poll(self) -> set[str]:
+        """Consume appended records; return the symbols whose entries changed."""
+        resync, self._resync = self._resync, True
+        touched: set[str] = set()
+        for tailer in (self.spine, self.intents):
+            symbols = tailer.poll()
+            if symbols is None:
+                resync = True
+            else:
+                touched |= symbols
+        self._resync = False
+        if resync:
+            touched = self._all_symbols()
+        changed: set[str] = set()
+        for symbol in touched:
+            if self.wanted is not None and symbol not in self.wanted:
+                continue
+            entry = _symbol_entry(symbol, self.spine.fold, self.intents.fold)
+            if entry == self.entries_by_symbol.get(symbol):
+                continue
+            changed.add(symbol)
+            if entry is None:
+                del self.entries_by_symbol[symbol]
+            else:
+                self.entries_by_symbol[symbol] = entry
+        return changed
+
+    def entries(self) -> list[Dict[str, Any]]:
+        return [self.entries_by_symbol[symbol] for symbol in sorted(self.entries_by_symbol)]
+
+
+def _follow(
+    live: _LiveSnapshot,
+    output_path: Path,
+    output_mode: str | None,
+    debounce: float,
+    poll_interval: float,
+    force_polling: bool,
+) -> None:
+    """Re-render output_path whenever a symbol's entry changes.
+
+    Changes are coalesced for `debounce` seconds after the first one is seen, then
+    written atomically in one render.
+    """
+
+    fragments = _FragmentCache()
+
+    def _write() -> None:
+        header_ts = datetime.now(timezone.utc).isoformat()
+        text = _render_to_text(output_mode, header_ts, live.entries(), fragments=fragments)
+        _atomic_write_text(output_path, text)
+
+    live.poll()
+    _write()
+    watcher = _make_watcher(live.paths, poll_interval, force_polling)
+    pending_since: float | None = None
+    try:
+        while True:
+            if pending_since is None:
+                timeout = poll_interval
+            else:
+                timeout = pending_since + debounce - time.monotonic()
+            watcher.wait(timeout)
+            if live.poll() and pending_since is None:
+                pending_since = time.monotonic()
+            if pending_since is not None and time.monotonic() - pending_since >= debounce:
+                _write()
+                pending_since = None
+    finally:
+        watcher.close()
+
+
+_SSE_KEEPALIVE_SECONDS = 15.0
+
+_SERVE_ROUTES = {
+    "/": ("html", "text/html; charset=utf-8"),
+    "/index.html": ("html", "text/html; charset=utf-8"),
+    "/snapshot.md": ("markdown", "text/markdown; charset=utf-8"),
+    "/snapshot.txt": ("terminal", "text/plain; charset=utf-8"),
+    "/snapshot.json": ("json", "application/json"),
+}
+
+
+class _SnapshotPublisher:
+    """Rendered bodies and per-symbol change versions for the current entries.
+
+    Bodies are built once per change and shared by all requests; the version
+    counter lets /events subscribers ask for everything that changed since the
+    version their page was rendered at. Only the tail thread calls refresh().
+    Event ids are "<epoch>-<version>": versions restart with the process, so an
+    id minted by another process (the epoch differs) cannot be resumed from.
+    """
+
+    def __init__(self, live: _LiveSnapshot) -> None:
+        self.live = live
+        self.epoch = format(time.time_ns(), "x")
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.header_ts = datetime.now(timezone.utc).isoformat()
+        self.version = 0
+        self.symbol_versions: Dict[str, int] = {}
+        # Copies of the live entries as of `version`; live itself is only touched by refresh().
+        self.entries: list[Dict[str, Any]] = []
+        self.entries_by_symbol: Dict[str, Dict[str, Any]] = {}
+        self._bodies: Dict[str, tuple[str, bytes, bytes]] = {}
+        self.fragments = _FragmentCache()
+
+    def refresh(self) -> None:
+        # File I/O and the fold run outside the lock; requests keep being served
+        # from the previous entries until the new ones are swapped in.
+        changed = self.live.poll()
+        if not changed and self.version:
+            return
+        entries_by_symbol = dict(self.live.entries_by_symbol)
+        entries = self.live.entries()
+        header_ts = datetime.now(timezone.utc).isoformat()
+        with self.lock:
+            self.version += 1
+            for symbol in changed:
+                self.symbol_versions[symbol] = self.version
+            self.entries = entries
+            self.entries_by_symbol = entries_by_symbol
+            # The header records when the served entries last changed.
+            self.header_ts = header_ts
+            self._bodies = {}
+            self.changed.notify_all()
+
+    def body(self, output_mode: str) -> tuple[str, bytes, bytes]:
+        """Return (etag, body, gzipped body) for output_mode; the ETag is a hash of the body."""
+        with self.lock:
+            cached = self._bodies.get(output_mode)
+            if cached is None:
+                events_url = f"/events?since={self.event_id()}" if output_mode == "html" else None
+                text = _render_to_text(output_mode, self.header_ts, self.entries, events_url, self.fragments)
+                raw = text.encode("utf-8")
+                etag = f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+                cached = (etag, raw, gzip.compress(raw, mtime=0))
+                self._bodies[output_mode] = cached
+            return cached
+
+    def event_id(self) -> str:
+        return f"{self.epoch}-{self.version}"
+
+    def version_of(self, event_id: str) -> int:
+        """The version a Last-Event-ID or since= value resumes from.
+
+        An empty value means "from now"; an id from another process, or anything
+        unparseable, resumes from 0 so the client is sent every entry.
+        """
+        if not event_id:
+            return self.version
+        epoch, _, version = event_id.rpartition("-")
+        if epoch != self.epoch or not (version.isascii() and version.isdigit()):
+            return 0
+        return int(version) if int(version) <= self.version else 0
+
+    def changes_since(self, version: int, timeout: float) -> tuple[int, list[str]]:
+        """Wait up to `timeout` for a version after `version`; return it with the SSE events to send."""
+        with self.lock:
+            self.changed.wait_for(lambda: self.version > version, timeout)
+            events = []
+            for symbol, changed_at in sorted(self.symbol_versions.items()):
+                if changed_at <= version:
+                    continue
+                entry = self.entries_by_symbol.get(symbol)
+                update = {
+                    "symbol": symbol,
+                    "entry": entry,
+                    "html": None if entry is None else self.fragments.section("html", entry),
+                    "header_ts": self.header_ts,
+                }
+                data = json.dumps(update, ensure_ascii=False, default=str)
+                events.append(f"id: {self.event_id()}\nevent: entry\ndata: {data}\n\n")
+            return self.version, events
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """True when an Accept-Encoding header gives gzip (or *, if gzip is not listed) a q above 0."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def _make_snapshot_handler(publisher: _SnapshotPublisher, coalesce: float) -> type:
+    class _SnapshotHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            path, _, query = self.path.partition("?")
+            if path == "/events":
+                self._stream_events(query)
+                return
+            route = _SERVE_ROUTES.get(path)
+            if route is None:
+                self.send_error(404)
+                return
+            output_mode, content_type = route
+            etag, raw, gzipped = publisher.body(output_mode)
+            use_gzip = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+            if use_gzip:
+                # A different representation needs its own strong validator.
+                etag = etag[:-1] + '-gzip"'
+            if etag in {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            payload = gzipped if use_gzip else raw
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream_events(self, query: str) -> None:
+            # Server-sent events: one "entry" event per changed symbol, carrying the
+            # _build_snapshot_entries dict (null when the symbol disappeared) and its
+            # rendered <section>. Bursts are coalesced for `coalesce` seconds, so a
+            # symbol updated many times in a burst is sent once, with its latest entry.
+            since = self.headers.get("Last-Event-ID") or dict(
+                part.split("=", 1) for part in query.split("&") if "=" in part
+            ).get("since", "")
+            version = publisher.version_of(since)
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            try:
+                while True:
+                    latest, events = publisher.changes_since(version, _SSE_KEEPALIVE_SECONDS)
+                    if latest > version and coalesce > 0:
+                        time.sleep(coalesce)
+                        latest, events = publisher.changes_since(version, 0)
+                    version = latest
+                    self.wfile.write("".join(events).encode("utf-8") if events else b": keepalive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Wallboards poll every second; per-request logging would dominate the cost.
+            pass
+
+    return _SnapshotHandler
+
+
+def _serve(
+    live: _LiveSnapshot,
+    host: str,
+    port: int,
+    poll_interval: float,
+    force_polling: bool,
+    coalesce: float,
+) -> None:
+    """Serve the in-memory snapshot over HTTP while a background thread keeps it current.
+
+    I/O and decoding errors while refreshing (an input briefly replaced by a
+    directory, a file shrinking mid-read) are reported on stderr and retried;
+    the last good snapshot keeps being served meanwhile. Any other failure
+    stops the server, so a supervisor restarts it instead of it serving a
+    frozen snapshot.
+    """
+    publisher = _SnapshotPublisher(live)
+    publisher.refresh()
+    watcher = _make_watcher(live.paths, poll_interval, force_polling)
+    server = ThreadingHTTPServer((host, port), _make_snapshot_handler(publisher, coalesce))
+    failures: list[BaseException] = []
+
+    def _tail() -> None:
+        failing = None
+        try:
+            while True:
+                watcher.wait(poll_interval)
+                try:
+                    publisher.refresh()
+                except (OSError, ValueError) as exc:
+                    # Reported once per distinct error, not once per poll.
+                    message = f"{type(exc).__name__}: {exc}"
+                    if message != failing:
+                        sys.stderr.write(f"serve: refreshing the snapshot failed, retrying: {message}\n")
+                        failing = message
+                    continue
+                if failing is not None:
+                    sys.stderr.write("serve: snapshot refresh recovered\n")
+                    failing = None
+        except Exception as exc:
+            failures.append(exc)
+            server.shutdown()
+            raise
+
+    threading.Thread(target=_tail, name="snapshot-tail", daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        watcher.close()
+    if failures:
+        raise SystemExit(f"serve: the snapshot tail thread failed: {failures[0]!r}")
+
+
+def _cutoff_range(start: str, end: str, minutes: str) -> list[str]:
+    step = timedelta(minutes=_positive_int(minutes))
+    first = _parse_utc(start)
+    last = _parse_utc(end)
+    # Keep the caller's suffix so headers and manifests read like the input.
+    suffix = "Z" if start.endswith("Z") else "+00:00"
+    cutoffs = []
+    current = first
+    while current <= last:
+        cutoffs.append(current.strftime("%Y-%m-%dT%H:%M:%S") + suffix)
+        current += step
+    return cutoffs
+
+
+def _parse_utc(value: str) -> datetime:
+    # Through _ts_key, so --cutoff-range accepts exactly the layouts the folds do.
+    ts_key = _ts_key(value)
+    if ts_key is None:
+        raise argparse.ArgumentTypeError(f"expected an ISO-8601 UTC timestamp, got {value!r}")
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=ts_key // 1000)
+
+
+def _symbol_list(value: str) -> list[str]:
+    symbols = [symbol.strip() for symbol in value.split(",") if symbol.strip()]
+    if not symbols:
+        raise argparse.ArgumentTypeError("expected at least one symbol")
+    return symbols
+
+
+def _worker_count(value: str) -> int:
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid worker count: {value!r}") from None
+    if workers < 0:
+        raise argparse.ArgumentTypeError("worker count must be >= 0")
+    return workers or (os.cpu_count() or 1)
+
+
+def _json_backend_self_check(spine_path: Path, intents_path: Path, strict: bool) -> bool:
+    """Fold both inputs with every installed backend; True when all folds are byte-identical."""
+    digests: Dict[str, str] = {}
+    for backend in sorted(_JSON_BACKENDS):
+        spine_summary = _parse_event_spine(spine_path, strict=strict, json_backend=backend)
+        intent_summary = (
+            _parse_router_intents(intents_path, json_backend=backend) if intents_path.exists() else {}
         )
-        print(f"      <li><strong>last regime change:</strong> {_escape(entry['change_value'])}</li>")
-        print(
-            f"      <li><strong>posture:</strong> {_escape(entry['direction'])} / "
-            f"{_escape(entry['risk_cap'])} / size={_escape(entry['size_pct'])}</li>"
+        canonical = json.dumps(
+            [spine_summary, intent_summary], sort_keys=True, separators=(",", ":"), default=_record_as_dict
         )
-        print("    </ul>")
-        print("")
-        print("    <strong>rationale:</strong>")
-        print("    <ul>")
-        rationale = entry.get("rationale")
-        if isinstance(rationale, list) and rationale:
-            for line in rationale:
-                print(f"      <li>{_escape(line)}</li>")
+        digests[backend] = hashlib.sha256(canonical.encode("ascii")).hexdigest()
+        print(f"{backend}: {digests[backend]}")
+    identical = len(set(digests.values())) == 1
+    print("identical" if identical else "MISMATCH")
+    return identical
+
+
+class _Stats:
+    """Phase timings and per-input fold counters for --stats; built only when asked for."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.inputs: Dict[str, Counter] = {}
+        self.skipped = False
+
+    def counts(self, name: str) -> Counter:
+        return self.inputs.setdefault(name, Counter())
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def report(self) -> Dict[str, Any]:
+        inputs: Dict[str, Dict[str, Any]] = {}
+        for name, counts in self.inputs.items():
+            counts = counts.copy()
+            # The prefilter runs inside the byte scanner, so lines without the event-type
+            # literal are never fed and cannot be told apart (tick, blank, garbage);
+            # --strict feeds every line and splits them by reason instead.
+            skipped = counts["lines_read"] - counts["lines_fed"]
+            if skipped > 0:
+                counts["rejected_prefilter"] = skipped
+            entry: Dict[str, Any] = dict(sorted(counts.items()))
+            entry["decode_seconds"] = round(entry.pop("decode_ns", 0) / 1e9, 6)
+            inputs[name] = entry
+        return {
+            "skipped": self.skipped,
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "inputs": inputs,
+        }
+
+
+def _stats_phase(stats: _Stats | None, name: str) -> Any:
+    return contextlib.nullcontext() if stats is None else stats.phase(name)
+
+
+def _metric_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_metrics(
+    stats: _Stats,
+    symbols: list[str],
+    spine_summary: Dict[str, Dict[str, Any]],
+    intent_summary: Dict[str, _IntentRecord],
+    now: float,
+) -> str:
+    """OpenMetrics text for a node-exporter textfile collector.
+
+    Record timestamps are exported next to their age at render time: with
+    --skip-unchanged the file is not rewritten while the inputs are idle, so
+    alerts should prefer time() - synthdesk_snapshot_record_timestamp_seconds.
+    """
+    timestamps: list[str] = []
+    ages: list[str] = []
+    for symbol in symbols:
+        records = [
+            (event_type, spine_summary.get(symbol, {}).get(event_type))
+            for event_type in ("market.regime", "market.regime_change")
+        ]
+        records.append(("intent", intent_summary.get(symbol)))
+        for record_type, record in records:
+            if record is None:
+                continue
+            labels = f'{{symbol="{_metric_label(symbol)}",record="{record_type}"}}'
+            seconds = record.ts_key / 1e9
+            timestamps.append(f"synthdesk_snapshot_record_timestamp_seconds{labels} {seconds:.6f}")
+            ages.append(f"synthdesk_snapshot_record_age_seconds{labels} {now - seconds:.6f}")
+    lines = [
+        "# TYPE synthdesk_snapshot_render_timestamp_seconds gauge",
+        "# UNIT synthdesk_snapshot_render_timestamp_seconds seconds",
+        "# HELP synthdesk_snapshot_render_timestamp_seconds When this file was rendered.",
+        f"synthdesk_snapshot_render_timestamp_seconds {now:.6f}",
+        "# TYPE synthdesk_snapshot_symbols gauge",
+        "# HELP synthdesk_snapshot_symbols Symbols in the snapshot.",
+        f"synthdesk_snapshot_symbols {len(symbols)}",
+        "# TYPE synthdesk_snapshot_record_timestamp_seconds gauge",
+        "# UNIT synthdesk_snapshot_record_timestamp_seconds seconds",
+        "# HELP synthdesk_snapshot_record_timestamp_seconds Timestamp of the latest record per symbol.",
+        *timestamps,
+        "# TYPE synthdesk_snapshot_record_age_seconds gauge",
+        "# UNIT synthdesk_snapshot_record_age_seconds seconds",
+        "# HELP synthdesk_snapshot_record_age_seconds Age of the latest record per symbol at render time.",
+        *ages,
+        "# TYPE synthdesk_snapshot_read_bytes gauge",
+        "# UNIT synthdesk_snapshot_read_bytes bytes",
+        "# HELP synthdesk_snapshot_read_bytes Input bytes read by the last render.",
+    ]
+    for name, counts in stats.inputs.items():
+        lines.append(f'synthdesk_snapshot_read_bytes{{input="{name}"}} {counts["bytes_read"]}')
+    lines += [
+        "# TYPE synthdesk_snapshot_phase_duration_seconds gauge",
+        "# UNIT synthdesk_snapshot_phase_duration_seconds seconds",
+        "# HELP synthdesk_snapshot_phase_duration_seconds Wall time of each phase of the last render.",
+    ]
+    for name, seconds in stats.phases.items():
+        lines.append(f'synthdesk_snapshot_phase_duration_seconds{{phase="{name}"}} {seconds:.6f}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _timestamp_arg(value: str) -> str:
+    if not _is_valid_ts(value):
+        raise argparse.ArgumentTypeError(f"expected an ISO-8601 UTC timestamp, got {value!r}")
+    return value
+
+
+_OUTPUT_MODES = ("markdown", "html", "json", "terminal")
+
+
+def _output_target(value: str) -> tuple[str, Path]:
+    output_mode, sep, path = value.partition("=")
+    if not sep or output_mode not in _OUTPUT_MODES or not path:
+        formats = ", ".join(_OUTPUT_MODES)
+        raise argparse.ArgumentTypeError(f"expected FORMAT=PATH with FORMAT one of {formats}")
+    return output_mode, Path(path)
+
+
+def _header_ts_arg(value: str) -> str:
+    if value in ("now", "inputs"):
+        return value
+    return _timestamp_arg(value)
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be > 0")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}") from None
+    if not number > 0:
+        raise argparse.ArgumentTypeError("must be > 0")
+    return number
+
+
+def _build_follow_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="synthdesk_snapshot.py follow",
+        description="Tail both inputs with the fold kept in memory; re-render OUTPUT when an entry changes.",
+    )
+    parser.add_argument("event_spine", type=Path)
+    parser.add_argument("router_intents", type=Path)
+    parser.add_argument(
+        "output_mode", nargs="?", default=None, help="markdown, html, json or terminal (default)"
+    )
+    parser.add_argument(
+        "--output", type=Path, required=True, metavar="PATH", help="file to re-render atomically"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=_positive_float,
+        default=0.25,
+        metavar="SECONDS",
+        help="coalesce changes for this long before re-rendering (default 0.25)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=_positive_float,
+        default=1.0,
+        metavar="SECONDS",
+        help="polling period without inotify, and safety re-check period with it (default 1.0)",
+    )
+    parser.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    parser.add_argument("--symbols", type=_symbol_list, default=None, metavar="SYM[,SYM...]")
+    parser.add_argument("--json-backend", choices=["auto", *sorted(_JSON_BACKENDS)], default="auto")
+    parser.add_argument("--strict", action="store_true", help="disable the spine event-type prefilter")
+    return parser
+
+
+def _follow_main(argv: list[str]) -> None:
+    args = _build_follow_parser().parse_intermixed_args(argv)
+    live = _LiveSnapshot(
+        args.event_spine,
+        args.router_intents,
+        args.symbols,
+        args.strict,
+        _resolve_json_backend(args.json_backend),
+    )
+    try:
+        _follow(live, args.output, args.output_mode, args.debounce, args.poll_interval, args.poll)
+    except KeyboardInterrupt:
+        pass
+
+
+def _build_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="synthdesk_snapshot.py serve",
+        description=(
+            "Serve the snapshot from memory: / (html), /snapshot.md, /snapshot.txt, /snapshot.json. "
+            "Responses carry an entry-content ETag and are gzip-compressed on request. "
+            "/events streams per-symbol entry changes as server-sent events."
+        ),
+    )
+    parser.add_argument("event_spine", type=Path)
+    parser.add_argument("router_intents", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--poll-interval",
+        type=_positive_float,
+        default=1.0,
+        metavar="SECONDS",
+        help="polling period without inotify, and safety re-check period with it (default 1.0)",
+    )
+    parser.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    parser.add_argument(
+        "--coalesce",
+        type=float,
+        default=0.25,
+        metavar="SECONDS",
+        help="gather changes for this long before pushing them to /events subscribers (default 0.25)",
+    )
+    parser.add_argument("--symbols", type=_symbol_list, default=None, metavar="SYM[,SYM...]")
+    parser.add_argument("--json-backend", choices=["auto", *sorted(_JSON_BACKENDS)], default="auto")
+    parser.add_argument("--strict", action="store_true", help="disable the spine event-type prefilter")
+    return parser
+
+
+def _serve_main(argv: list[str]) -> None:
+    args = _build_serve_parser().parse_intermixed_args(argv)
+    live = _LiveSnapshot(
+        args.event_spine,
+        args.router_intents,
+        args.symbols,
+        args.strict,
+        _resolve_json_backend(args.json_backend),
+    )
+    try:
+        _serve(live, args.host, args.port, args.poll_interval, args.poll, max(0.0, args.coalesce))
+    except KeyboardInterrupt:
+        pass
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="synthdesk_snapshot.py",
+        description="Render a read-only snapshot from an event spine and router intents.",
+    )
+    parser.add_argument("event_spine", type=Path)
+    parser.add_argument("router_intents", type=Path)
+    parser.add_argument(
+        "output_mode", nargs="?", default=None, help="markdown, html, json or terminal (default)"
+    )
+    parser.add_argument(
+        "--spine-checkpoint",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="resume the spine fold from PATH and persist the new byte offset there",
+    )
+    parser.add_argument(
+        "--intent-checkpoint",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="resume the router-intent fold from PATH and persist the new byte offset there",
+    )
+    parser.add_argument(
+        "--symbol-index",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="keep a per-symbol offset index at PATH (e.g. next to the spine); decode only indexed records",
+    )
+    parser.add_argument(
+        "--symbols",
+        type=_symbol_list,
+        default=None,
+        metavar="SYM[,SYM...]",
+        help="render only these symbols",
+    )
+    parser.add_argument(
+        "--reverse",
+        action="store_true",
+        help="scan the spine backwards from EOF and stop once every --symbols entry is resolved",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_worker_count,
+        default=1,
+        metavar="N",
+        help="fold the spine in N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--as-of",
+        type=_timestamp_arg,
+        default=None,
+        metavar="TS",
+        help="render the snapshot as of this ISO-8601 UTC timestamp (records after it are ignored)",
+    )
+    parser.add_argument(
+        "--header-ts",
+        type=_header_ts_arg,
+        default=None,
+        metavar="now|inputs|TS",
+        help=(
+            "header timestamp: the render time (default), the latest timestamp among the rendered "
+            "records, or TS; with inputs or TS the output is a pure function of the inputs"
+        ),
+    )
+    parser.add_argument(
+        "--time-index",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="keep a sparse spine time index at PATH so --as-of stops reading early",
+    )
+    parser.add_argument(
+        "--time-index-block-mb",
+        type=_positive_int,
+        default=4,
+        metavar="N",
+        help="bytes of spine per time-index block, in MiB (default 4)",
+    )
+    parser.add_argument(
+        "--sweep-dir",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="write one content-addressed snapshot per cutoff to DIR from a single pass",
+    )
+    parser.add_argument(
+        "--cutoff",
+        type=_timestamp_arg,
+        action="append",
+        default=[],
+        metavar="TS",
+        help="sweep cutoff timestamp (repeatable)",
+    )
+    parser.add_argument(
+        "--cutoff-range",
+        nargs=3,
+        default=None,
+        metavar=("FROM", "TO", "MINUTES"),
+        help="sweep cutoffs every MINUTES from FROM through TO",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="write the snapshot to PATH (atomically) instead of stdout",
+    )
+    parser.add_argument(
+        "--out",
+        type=_output_target,
+        action="append",
+        default=[],
+        metavar="FORMAT=PATH",
+        help="also write FORMAT to PATH (atomically); repeatable, all from one parse",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help=(
+            "with --output/--out: record an input fingerprint next to the first output and exit "
+            "without parsing when the inputs and arguments match the last render"
+        ),
+    )
+    parser.add_argument(
+        "--skip-unchanged-record",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="keep the --skip-unchanged fingerprint at PATH (e.g. outside a web root) instead",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help=(
+            "report phase timings and per-input line, byte and rejection counts as JSON on stderr; "
+            "spine lines the prefilter skips are one rejected_prefilter count "
+            "(--strict splits them by reason)"
+        ),
+    )
+    parser.add_argument(
+        "--stats-file",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="write the --stats report to PATH (atomically); stderr is used only with --stats",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=(
+            "write OpenMetrics text (per-symbol record age, bytes read, phase durations) to PATH "
+            "atomically, e.g. for a node-exporter textfile collector"
+        ),
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=["auto", *sorted(_JSON_BACKENDS)],
+        default="auto",
+        help="record decoder (auto prefers orjson, then simdjson, then the stdlib)",
+    )
+    parser.add_argument(
+        "--self-check",
+        action="store_true",
+        help="fold the inputs with every installed JSON backend, compare digests and exit",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="decode every spine line (disables the event-type prefilter; for verification)",
+    )
+    return parser
+
+
+def _snapshot_main(
+    args: argparse.Namespace,
+    cutoffs: list[str],
+    targets: list[tuple[str, Path]],
+    stats: _Stats | None,
+) -> None:
+    event_spine_path = args.event_spine
+    router_intents_path = args.router_intents
+    if not event_spine_path.exists():
+        return None
+    input_paths = [event_spine_path, router_intents_path]
+    if args.skip_unchanged:
+        record_path = args.skip_unchanged_record or _inputs_record_path(targets[0][1])
+        with _stats_phase(stats, "skip_check"):
+            outputs_exist = all(path.exists() for _, path in targets)
+            if outputs_exist and _inputs_unchanged(record_path, input_paths, sys.argv[1:]):
+                if stats is not None:
+                    stats.skipped = True
+                return None
+            # Taken before parsing: records appended meanwhile make the next run render again.
+            input_fingerprints = _input_fingerprints(input_paths)
+    if args.self_check:
+        if not _json_backend_self_check(event_spine_path, router_intents_path, args.strict):
+            sys.exit(1)
+        return None
+    json_backend = _resolve_json_backend(args.json_backend)
+    if args.sweep_dir is not None:
+        with _stats_phase(stats, "sweep"):
+            _sweep_snapshots(
+                event_spine_path,
+                router_intents_path,
+                cutoffs,
+                args.sweep_dir,
+                args.output_mode,
+                args.symbols,
+                args.strict,
+                json_backend,
+            )
+        return None
+    with _stats_phase(stats, "parse_spine"):
+        spine_summary = _parse_event_spine(
+            event_spine_path,
+            checkpoint_path=args.spine_checkpoint,
+            strict=args.strict,
+            reverse_symbols=args.symbols if args.reverse else None,
+            workers=args.workers,
+            json_backend=json_backend,
+            symbol_index_path=args.symbol_index,
+            index_symbols=args.symbols,
+            as_of=args.as_of,
+            time_index_path=args.time_index,
+            time_index_block_bytes=args.time_index_block_mb << 20,
+            counts=None if stats is None else stats.counts("spine"),
+        )
+    with _stats_phase(stats, "parse_intents"):
+        intent_summary = (
+            _parse_router_intents(
+                router_intents_path,
+                checkpoint_path=args.intent_checkpoint,
+                json_backend=json_backend,
+                as_of=args.as_of,
+                counts=None if stats is None else stats.counts("intents"),
+            )
+            if router_intents_path.exists()
+            else {}
+        )
+
+    with _stats_phase(stats, "build_entries"):
+        symbols = _select_symbols(spine_summary, intent_summary, args.symbols)
+        if args.header_ts == "inputs":
+            header_ts = _inputs_header_ts(symbols, spine_summary, intent_summary)
+        elif args.header_ts not in (None, "now"):
+            header_ts = args.header_ts
+        elif args.as_of is not None and args.header_ts is None:
+            # An as-of snapshot is stamped with the moment it reproduces.
+            header_ts = args.as_of
         else:
-            print("      <li>—</li>")
-        print("    </ul>")
-        print("  </section>")
-    print("</body>")
-    print("</html>")
+            header_ts = datetime.now(timezone.utc).isoformat()
+        entries = _build_snapshot_entries(symbols, spine_summary, intent_summary)
+    if not targets:
+        with _stats_phase(stats, "render"):
+            _render(args.output_mode, header_ts, entries)
+    for output_mode, path in targets:
+        with _stats_phase(stats, f"render_{output_mode}"):
+            text = _render_to_text(output_mode, header_ts, entries)
+        with _stats_phase(stats, "write"):
+            _atomic_write_text(path, text)
+    if args.metrics_file is not None and stats is not None:
+        metrics = _render_metrics(stats, symbols, spine_summary, intent_summary, time.time())
+        _atomic_write_text(args.metrics_file, metrics)
+    if args.skip_unchanged:
+        source = {"argv": sys.argv[1:], "inputs": input_fingerprints}
+        _store_checkpoint(record_path, "render-inputs", source, {})
+    return None
 
 
 def main() -> None:
     """Entry point stub for snapshot renderer."""
     if len(sys.argv) < 3:
         return None
-    event_spine_path = Path(sys.argv[1])
-    router_intents_path = Path(sys.argv[2])
-    if not event_spine_path.exists():
+    if sys.argv[1] == "follow":
+        _follow_main(sys.argv[2:])
         return None
-    spine_summary = _parse_event_spine(event_spine_path)
-    intent_summary = _parse_router_intents(router_intents_path) if router_intents_path.exists() else {}
-
-    header_ts = datetime.now(timezone.utc).isoformat()
-    symbols = sorted(set(spine_summary.keys()) | set(intent_summary.keys()))
-    entries = _build_snapshot_entries(symbols, spine_summary, intent_summary)
-    output_mode = sys.argv[3] if len(sys.argv) > 3 else None
-    if output_mode == "markdown":
-        _render_markdown(header_ts, entries)
-        return None
-    if output_mode == "html":
-        _render_html(header_ts, entries)
+    if sys.argv[1] == "serve":
+        _serve_main(sys.argv[2:])
         return None
-    _render_terminal(header_ts, entries)
+    parser = _build_arg_parser()
+    args = parser.parse_intermixed_args(sys.argv[1:])
+    if args.reverse and args.symbols is None:
+        parser.error("--reverse needs --symbols to know when to stop")
+    spine_modes = [
+        flag
+        for flag, enabled in (
+            ("--reverse", args.reverse),
+            ("--spine-checkpoint", args.spine_checkpoint is not None),
+            ("--workers", args.workers > 1),
+            ("--symbol-index", args.symbol_index is not None),
+        )
+        if enabled
+    ]
+    if len(spine_modes) > 1:
+        parser.error(f"{' and '.join(spine_modes)} are mutually exclusive")
+    if args.time_index is not None and args.as_of is None:
+        parser.error("--time-index is only used together with --as-of")
+    if args.as_of is not None or args.sweep_dir is not None:
+        # Checkpoints and indexes describe the latest state, not a historical one.
+        if spine_modes or args.intent_checkpoint is not None:
+            parser.error("historical snapshots cannot use checkpoints, indexes, --reverse or --workers")
+    cutoffs = list(args.cutoff)
+    if args.cutoff_range is not None:
+        try:
+            cutoffs.extend(_cutoff_range(*args.cutoff_range))
+        except argparse.ArgumentTypeError as exc:
+            parser.error(f"--cutoff-range: {exc}")
+    if args.sweep_dir is not None and (not cutoffs or args.as_of is not None):
+        parser.error("--sweep-dir needs --cutoff or --cutoff-range and excludes --as-of")
+    targets = list(args.out)
+    if args.output is not None:
+        targets.insert(0, (args.output_mode or "terminal", args.output))
+    if targets and (args.sweep_dir is not None or args.self_check):
+        parser.error("--output/--out cannot be combined with --sweep-dir or --self-check")
+    if args.skip_unchanged and not targets:
+        parser.error("--skip-unchanged needs --output or --out")
+    if args.skip_unchanged_record is not None and not args.skip_unchanged:
+        parser.error("--skip-unchanged-record is only used together with --skip-unchanged")
+    if args.metrics_file is not None and (args.sweep_dir is not None or args.self_check):
+        parser.error("--metrics-file cannot be combined with --sweep-dir or --self-check")
+    # --metrics-file reports the same timings and byte counts as --stats.
+    wants_stats = args.stats or args.stats_file is not None or args.metrics_file is not None
+    stats = _Stats() if wants_stats else None
+    _snapshot_main(args, cutoffs, targets, stats)
+    if stats is not None:
+        text = json.dumps(stats.report(), indent=2) + "\n"
+        if args.stats_file is not None:
+            _atomic_write_text(args.stats_file, text)
+        if args.stats:
+            sys.stderr.write(text)
     return None
 
 
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from support import generate_dataset
+
+
+@pytest.fixture(scope="session")
+def data(tmp_path_factory: pytest.TempPathFactory) -> Dict[str, Path]:
+    return generate_dataset(tmp_path_factory.mktemp("data"), disorder=0.02)
@@ -0,0 +1,64 @@
+"""Shared helpers: import paths for the snapshot module and the bench generator."""
+
+from __future__ import annotations
+
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "snapshot"))
+sys.path.insert(0, str(ROOT / "bench"))
+
+import generate  # noqa: E402
+import synthdesk_snapshot as snapshot  # noqa: E402
+
+SCRIPT = ROOT / "snapshot" / "synthdesk_snapshot.py"
+MIX = {"tick": 80.0, "market.regime": 14.0, "market.regime_change": 6.0}
+HEADER_TS = "2030-01-01T00:00:00Z"
+
+
+def generate_dataset(out_dir: Path, disorder: float) -> Dict[str, Path]:
+    """A seeded spine and intents pair with malformed and (unless disorder=0) out-of-order records."""
+    generate.generate(
+        out_dir,
+        spine_size=1 << 20,
+        intent_size=128 << 10,
+        symbol_count=200,
+        mix=MIX,
+        malformed=0.02,
+        disorder=disorder,
+        seed=11,
+    )
+    return {"spine": out_dir / "spine.jsonl", "intents": out_dir / "intents.jsonl"}
+
+
+def entries(spine_summary: Any, intent_summary: Any, wanted: Any = None) -> list[Dict[str, Any]]:
+    symbols = snapshot._select_symbols(spine_summary, intent_summary, wanted)
+    return snapshot._build_snapshot_entries(symbols, spine_summary, intent_summary)
+
+
+def chunks(data: bytes, seed: int) -> list[bytes]:
+    """data cut at arbitrary points, so appends regularly end mid-record."""
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(data)), 6)) + [len(data)]
+    return [data[start:end] for start, end in zip([0] + cuts, cuts)]
+
+
+def regime_cutoffs(path: Path) -> list[str]:
+    """Three regime timestamps spread over the start of the spine, for as-of tests."""
+    stamps = sorted(
+        json.loads(line)["timestamp"]
+        for line in path.read_bytes().splitlines()[:2000]
+        if b'"market.regime' in line and b"yesterday" not in line and line.endswith(b"}")
+    )
+    return [stamps[len(stamps) * part // 4] for part in range(1, 4)]
+
+
+def run_cli(*args: Any) -> subprocess.CompletedProcess:
+    """Run the snapshot CLI; stdout and stderr are captured as text."""
+    command = [sys.executable, str(SCRIPT), *map(str, args)]
+    return subprocess.run(command, capture_output=True, text=True, timeout=120, check=True)
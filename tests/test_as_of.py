@@ -0,0 +1,87 @@
+"""--as-of folds, with and without the time index, equal a fold of the records up to the cutoff."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from support import chunks, entries, regime_cutoffs, snapshot
+
+
+def _records_until(path: Path, cutoff: str, target: Path) -> Path:
+    # Reference for as-of folds: the lines whose timestamp is at or before the cutoff.
+    cutoff_key = snapshot._ts_key(cutoff)
+    kept = []
+    for line in path.read_bytes().split(b"\n"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        ts_key = snapshot._ts_key(record.get("timestamp")) if isinstance(record, dict) else None
+        if ts_key is not None and ts_key <= cutoff_key:
+            kept.append(line)
+    target.write_bytes(b"\n".join(kept) + b"\n")
+    return target
+
+
+def test_as_of_matches_fold_of_earlier_records(data: Dict[str, Path], tmp_path: Path) -> None:
+    for cutoff in regime_cutoffs(data["spine"]):
+        expected_spine = snapshot._parse_event_spine(_records_until(data["spine"], cutoff, tmp_path / "s"))
+        expected_intents = snapshot._parse_router_intents(
+            _records_until(data["intents"], cutoff, tmp_path / "i")
+        )
+        assert snapshot._parse_event_spine(data["spine"], as_of=cutoff) == expected_spine
+        assert snapshot._parse_router_intents(data["intents"], as_of=cutoff) == expected_intents
+        for _ in range(2):  # build the time index, then reuse it
+            indexed = snapshot._parse_event_spine(
+                data["spine"],
+                as_of=cutoff,
+                time_index_path=tmp_path / "time-index.json",
+                time_index_block_bytes=64 << 10,
+            )
+            assert indexed == expected_spine
+
+
+def test_time_index_follows_appends(data: Dict[str, Path], tmp_path: Path) -> None:
+    path = tmp_path / "spine.jsonl"
+    path.write_bytes(b"")
+    cutoffs = regime_cutoffs(data["spine"])
+    for chunk in chunks(data["spine"].read_bytes(), seed=6):
+        with path.open("ab") as handle:
+            handle.write(chunk)
+        for cutoff in cutoffs:
+            indexed = snapshot._parse_event_spine(
+                path,
+                as_of=cutoff,
+                time_index_path=tmp_path / "time-index.json",
+                time_index_block_bytes=16 << 10,
+            )
+            assert indexed == snapshot._parse_event_spine(path, as_of=cutoff)
+
+
+def _other_suffix(stamp: str) -> str:
+    return stamp[:-1] + "+00:00" if stamp.endswith("Z") else stamp[: -len("+00:00")] + "Z"
+
+
+@pytest.mark.parametrize("mixed_layouts", [False, True])
+def test_sweep_matches_as_of_renders(data: Dict[str, Path], tmp_path: Path, mixed_layouts: bool) -> None:
+    cutoffs = regime_cutoffs(data["spine"])
+    if mixed_layouts:
+        # The same instants spelled the other way sort by key, not by string, and render alike.
+        cutoffs += [_other_suffix(cutoff) for cutoff in cutoffs]
+    snapshot._sweep_snapshots(
+        data["spine"], data["intents"], cutoffs, tmp_path, "markdown", None, False, "stdlib"
+    )
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    as_of = [item["as_of"] for item in manifest["snapshots"]]
+    assert sorted(as_of) == sorted(cutoffs)
+    assert [snapshot._ts_key(cutoff) for cutoff in as_of] == sorted(map(snapshot._ts_key, cutoffs))
+    for item in manifest["snapshots"]:
+        spine_summary = snapshot._parse_event_spine(data["spine"], as_of=item["as_of"])
+        intent_summary = snapshot._parse_router_intents(data["intents"], as_of=item["as_of"])
+        expected = snapshot._render_to_text(
+            "markdown", item["as_of"], entries(spine_summary, intent_summary)
+        )
+        assert (tmp_path / item["file"]).read_text(encoding="utf-8") == expected
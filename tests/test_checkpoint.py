@@ -0,0 +1,61 @@
+"""Checkpointed folds resume where the last run stopped and still equal a full fold."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from support import chunks, snapshot
+
+_PARSERS = {"spine": snapshot._parse_event_spine, "intents": snapshot._parse_router_intents}
+
+
+@pytest.mark.parametrize("kind", ["spine", "intents"])
+def test_resume_after_appends_matches_full_fold(data: Dict[str, Path], tmp_path: Path, kind: str) -> None:
+    parse = _PARSERS[kind]
+    path = tmp_path / f"{kind}.jsonl"
+    path.write_bytes(b"")
+    for chunk in chunks(data[kind].read_bytes(), seed=1):
+        with path.open("ab") as handle:
+            handle.write(chunk)
+        assert parse(path, checkpoint_path=tmp_path / "checkpoint.json") == parse(path)
+
+
+@pytest.mark.parametrize("kind", ["spine", "intents"])
+def test_rewritten_input_is_refolded(data: Dict[str, Path], tmp_path: Path, kind: str) -> None:
+    parse = _PARSERS[kind]
+    lines = data[kind].read_bytes().splitlines(keepends=True)
+    path = tmp_path / f"{kind}.jsonl"
+    path.write_bytes(b"".join(lines[: len(lines) // 2]))
+    parse(path, checkpoint_path=tmp_path / "checkpoint.json")
+    # Same size and newer content: the prefix hash, not the offset, must notice.
+    path.write_bytes(b"".join(reversed(lines[: len(lines) // 2])))
+    assert parse(path, checkpoint_path=tmp_path / "checkpoint.json") == parse(path)
+
+
+def test_unreadable_checkpoint_is_ignored(data: Dict[str, Path], tmp_path: Path) -> None:
+    checkpoint = tmp_path / "checkpoint.json"
+    for text in ("not json", "[]", '{"version": 0}', '{"version": %d, "kind": "spine"}' % 99):
+        checkpoint.write_text(text, encoding="utf-8")
+        assert snapshot._parse_event_spine(data["spine"], checkpoint_path=checkpoint) == (
+            snapshot._parse_event_spine(data["spine"])
+        )
+
+
+def test_lone_surrogates_survive_a_checkpoint(tmp_path: Path) -> None:
+    # Valid JSON that no UTF-8 encoder accepts unescaped.
+    spine = tmp_path / "spine.jsonl"
+    spine.write_text(
+        '{"event_type": "market.regime", "timestamp": "2025-12-22T00:00:00Z",'
+        ' "payload": {"symbol": "X", "regime": "chop", "confidence": "\\ud800"}}\n',
+        encoding="utf-8",
+    )
+    expected = snapshot._parse_event_spine(spine)
+    for _ in range(2):  # write the checkpoint, then resume from it
+        assert snapshot._parse_event_spine(spine, checkpoint_path=tmp_path / "checkpoint.json") == expected
+    assert (tmp_path / "checkpoint.json").exists()
+    # The --skip-unchanged record stores argv, which holds surrogates for non-UTF-8 paths.
+    source = {"argv": ["out\udcff.md"], "inputs": []}
+    snapshot._store_checkpoint(tmp_path / "record.json", "render-inputs", source, {})
+    assert snapshot._load_checkpoint(tmp_path / "record.json", "render-inputs")["source"] == source
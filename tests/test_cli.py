@@ -0,0 +1,136 @@
+"""The snapshot command line: header timestamps, output targets and skipped renders."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from support import run_cli, snapshot
+
+
+def _render_json(data: Dict[str, Path], *args: Any) -> Dict[str, Any]:
+    return json.loads(run_cli(data["spine"], data["intents"], "json", *args).stdout)
+
+
+def _latest_stamp(data: Dict[str, Path], symbols: list[str]) -> str:
+    spine = snapshot._parse_event_spine(data["spine"])
+    intents = snapshot._parse_router_intents(data["intents"])
+    records = [record for symbol in symbols for record in spine.get(symbol, {}).values()]
+    records += [intents[symbol] for symbol in symbols if symbol in intents]
+    return max(records, key=lambda record: record.ts_key).timestamp
+
+
+@pytest.mark.parametrize("symbols", [None, ["SYM00003", "SYM00077"]])
+def test_header_ts_inputs_is_the_latest_rendered_record(
+    data: Dict[str, Path], symbols: list[str] | None
+) -> None:
+    args = ["--header-ts", "inputs"] + ([] if symbols is None else ["--symbols", ",".join(symbols)])
+    first = run_cli(data["spine"], data["intents"], "markdown", *args).stdout
+    time.sleep(0.01)
+    assert run_cli(data["spine"], data["intents"], "markdown", *args).stdout == first
+    rendered = _render_json(data, *args)
+    wanted = symbols or [entry["symbol"] for entry in rendered["entries"]]
+    assert rendered["header_ts"] == _latest_stamp(data, wanted)
+
+
+def test_header_ts_defaults(data: Dict[str, Path]) -> None:
+    assert _render_json(data, "--header-ts", "2031-01-01T00:00:00Z")["header_ts"] == "2031-01-01T00:00:00Z"
+    cutoff = "2025-12-22T00:00:00Z"
+    # An as-of snapshot is stamped with its cutoff unless the render time is asked for.
+    assert _render_json(data, "--as-of", cutoff)["header_ts"] == cutoff
+    now = _render_json(data, "--as-of", cutoff, "--header-ts", "now")["header_ts"]
+    assert abs(snapshot._ts_key(now) / 1e9 - time.time()) < 60
+
+
+@pytest.mark.parametrize("value", ["yesterday", "2025-12-22T00:00:00+01:00", ""])
+def test_header_ts_rejects_other_values(data: Dict[str, Path], value: str) -> None:
+    with pytest.raises(subprocess.CalledProcessError) as failure:
+        run_cli(data["spine"], data["intents"], "--header-ts", value)
+    assert failure.value.returncode == 2 and "--header-ts" in failure.value.stderr
+
+
+def _skip_run(data: Dict[str, Path], tmp_path: Path, output: Path, *args: Any) -> bool:
+    # True when the run skipped rendering.
+    stats_file = tmp_path / "stats.json"
+    run_cli(
+        data["spine"],
+        data["intents"],
+        "markdown",
+        "--output",
+        output,
+        "--skip-unchanged",
+        "--stats-file",
+        stats_file,
+        *args,
+    )
+    return json.loads(stats_file.read_text(encoding="utf-8"))["skipped"]
+
+
+def test_skip_unchanged_renders_only_when_something_changed(data: Dict[str, Path], tmp_path: Path) -> None:
+    spine = tmp_path / "spine.jsonl"
+    spine.write_bytes(data["spine"].read_bytes())
+    inputs = {"spine": spine, "intents": data["intents"]}
+    output = tmp_path / "site" / "snapshot.md"
+    output.parent.mkdir()
+    assert not _skip_run(inputs, tmp_path, output)
+    rendered = output.read_bytes()
+    assert _skip_run(inputs, tmp_path, output)
+    assert output.read_bytes() == rendered  # the header would carry a new render time otherwise
+    assert not _skip_run(inputs, tmp_path, output, "--symbols", "SYM00001")  # other arguments
+    assert not _skip_run(inputs, tmp_path, output)
+    with spine.open("ab") as handle:
+        handle.write(b"\n")
+    assert not _skip_run(inputs, tmp_path, output)
+    output.unlink()
+    assert not _skip_run(inputs, tmp_path, output)
+    assert output.exists() and _skip_run(inputs, tmp_path, output)
+    published = sorted(path.name for path in output.parent.iterdir())
+    assert published == [".snapshot.md.inputs.json", "snapshot.md"]
+
+
+def test_skip_unchanged_record_can_live_outside_the_output_directory(
+    data: Dict[str, Path], tmp_path: Path
+) -> None:
+    output = tmp_path / "site" / "snapshot.md"
+    output.parent.mkdir()
+    record = tmp_path / "state" / "inputs.json"
+    record.parent.mkdir()
+    assert not _skip_run(data, tmp_path, output, "--skip-unchanged-record", record)
+    assert _skip_run(data, tmp_path, output, "--skip-unchanged-record", record)
+    assert record.exists() and [path.name for path in output.parent.iterdir()] == ["snapshot.md"]
+
+
+def test_skip_unchanged_with_a_non_utf8_output_path(data: Dict[str, Path], tmp_path: Path) -> None:
+    # argv arrives as bytes; a name that is not UTF-8 decodes to lone surrogates.
+    output = tmp_path / "snapshot\udcff.md"
+    assert not _skip_run(data, tmp_path, output)
+    assert _skip_run(data, tmp_path, output)
+
+
+def test_out_writes_every_format_from_one_parse(data: Dict[str, Path], tmp_path: Path) -> None:
+    header = ["--header-ts", "inputs"]
+    targets = {mode: tmp_path / f"snapshot.{mode}" for mode in ("markdown", "html", "json", "terminal")}
+    first = tmp_path / "first.md"
+    stats_file = tmp_path / "stats.json"
+    args = ["markdown", "--output", first, "--stats-file", stats_file, *header]
+    args += [arg for mode, path in targets.items() for arg in ("--out", f"{mode}={path}")]
+    result = run_cli(data["spine"], data["intents"], *args)
+    assert result.stdout == ""
+    for mode, path in targets.items():
+        single = run_cli(data["spine"], data["intents"], mode, *header).stdout
+        assert path.read_text(encoding="utf-8") == single
+    assert first.read_bytes() == targets["markdown"].read_bytes()
+    phases = json.loads(stats_file.read_text(encoding="utf-8"))["phases"]
+    assert {"parse_spine", "parse_intents"} <= set(phases)
+    assert {f"render_{mode}" for mode in targets} <= set(phases)
+
+
+@pytest.mark.parametrize("target", ["markdown", "pdf=out.pdf", "json="])
+def test_out_rejects_malformed_targets(data: Dict[str, Path], target: str) -> None:
+    with pytest.raises(subprocess.CalledProcessError) as failure:
+        run_cli(data["spine"], data["intents"], "--out", target)
+    assert failure.value.returncode == 2 and "FORMAT=PATH" in failure.value.stderr
@@ -0,0 +1,171 @@
+"""SnapshotEngine and AsyncSnapshot: fed in arbitrary batches, they equal the CLI's full parse."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from support import HEADER_TS, chunks, entries, regime_cutoffs, snapshot
+
+
+def test_engine_matches_full_parse(data: Dict[str, Path]) -> None:
+    engine = snapshot.SnapshotEngine(json_backend="stdlib")
+    rng = random.Random(3)
+    for kind, feed in (("spine", engine.feed_spine_lines), ("intents", engine.feed_intent_lines)):
+        lines = data[kind].read_bytes().split(b"\n")
+        start = 0
+        while start < len(lines):
+            batch = lines[start : start + rng.randrange(1, 500)]
+            feed([line.decode("utf-8") for line in batch] if rng.random() < 0.5 else batch)
+            start += len(batch)
+    expected = entries(
+        snapshot._parse_event_spine(data["spine"]), snapshot._parse_router_intents(data["intents"])
+    )
+    assert engine.entries() == expected
+    for output_mode in ("markdown", "html", "json", "terminal"):
+        assert engine.render(output_mode, HEADER_TS) == snapshot._render_to_text(
+            output_mode, HEADER_TS, expected
+        )
+
+
+def test_feeds_report_the_symbols_whose_entry_changed(data: Dict[str, Path]) -> None:
+    engine = snapshot.SnapshotEngine(json_backend="stdlib")
+    rng = random.Random(8)
+    before: Dict[str, object] = {}
+    for kind, feed in (("spine", engine.feed_spine_lines), ("intents", engine.feed_intent_lines)):
+        lines = data[kind].read_bytes().split(b"\n")
+        start = 0
+        while start < len(lines):
+            batch = lines[start : start + rng.randrange(1, 200)]
+            start += len(batch)
+            touched = feed(batch)
+            after = {entry["symbol"]: entry for entry in engine.entries()}
+            changed = {symbol for symbol, entry in after.items() if before.get(symbol) != entry}
+            assert changed <= touched
+            for symbol in touched:
+                assert engine.entry(symbol) == after.get(symbol)
+            before = after
+
+
+def test_renders_reuse_the_entries_no_feed_touched(data: Dict[str, Path]) -> None:
+    engine = snapshot.SnapshotEngine(json_backend="stdlib")
+    engine.feed_spine_lines(data["spine"].read_bytes().split(b"\n"))
+    engine.feed_intent_lines(data["intents"].read_bytes().split(b"\n"))
+    before = {entry["symbol"]: entry for entry in engine.entries()}
+    symbol = sorted(before)[0]
+    touched = engine.feed_spine_lines(
+        [
+            '{"event_type": "market.regime", "timestamp": "2099-01-01T00:00:00Z",'
+            f' "payload": {{"symbol": "{symbol}", "regime": "later"}}}}'
+        ]
+    )
+    after = {entry["symbol"]: entry for entry in engine.entries()}
+    assert touched == {symbol} and after[symbol]["regime"] == "later"
+    assert all(after[other] is before[other] for other in before if other != symbol)
+    for output_mode in ("markdown", "html", "json", "terminal"):
+        engine.render(output_mode, HEADER_TS)
+        assert engine.render(output_mode, HEADER_TS) == snapshot._render_to_text(
+            output_mode, HEADER_TS, list(after.values())
+        )
+    engine.reset_spine()
+    assert engine.render("markdown", HEADER_TS) == snapshot._render_to_text(
+        "markdown", HEADER_TS, entries({}, snapshot._parse_router_intents(data["intents"]))
+    )
+
+
+def test_an_equal_but_differently_rendered_value_is_rerendered() -> None:
+    engine = snapshot.SnapshotEngine(json_backend="stdlib")
+    for timestamp, size_pct in (("2025-12-22T00:00:00Z", "1"), ("2025-12-22T00:00:05Z", "1.0")):
+        engine.feed_intent_lines(
+            [f'{{"timestamp": "{timestamp}", "symbol": "X", "payload": {{"size_pct": {size_pct}}}}}']
+        )
+        assert f"size={size_pct}" in engine.render("terminal", HEADER_TS)
+
+
+def test_as_of_and_symbols_match_the_cli_options(data: Dict[str, Path]) -> None:
+    cutoff = regime_cutoffs(data["spine"])[1]
+    wanted = ["SYM00007", "SYM00150", "MISSING"]
+    engine = snapshot.SnapshotEngine(symbols=wanted, json_backend="stdlib", as_of=cutoff)
+    engine.feed_spine_lines(data["spine"].read_bytes().split(b"\n"))
+    engine.feed_intent_lines(data["intents"].read_bytes().split(b"\n"))
+    expected = entries(
+        snapshot._parse_event_spine(data["spine"], as_of=cutoff),
+        snapshot._parse_router_intents(data["intents"], as_of=cutoff),
+        wanted,
+    )
+    assert engine.entries() == expected
+    assert engine.render("json") == snapshot._render_to_text("json", cutoff, expected)
+    assert engine.entry("SYM00001") is None
+
+
+def test_invalid_as_of_is_refused() -> None:
+    with pytest.raises(ValueError):
+        snapshot.SnapshotEngine(as_of="yesterday")
+
+
+def test_async_snapshot_follows_appends(data: Dict[str, Path], tmp_path: Path) -> None:
+    spine_path = tmp_path / "spine.jsonl"
+    intents_path = tmp_path / "intents.jsonl"
+    spinechunks = chunks(data["spine"].read_bytes(), seed=4)
+    spine_path.write_bytes(spinechunks[0])
+    intents_path.write_bytes(data["intents"].read_bytes())
+
+    def expected() -> list[Dict[str, Any]]:
+        # Tails leave an unterminated final record for later; so does the reference.
+        complete = spine_path.read_bytes().rpartition(b"\n")[0] + b"\n"
+        (tmp_path / "complete.jsonl").write_bytes(complete)
+        return entries(
+            snapshot._parse_event_spine(tmp_path / "complete.jsonl"),
+            snapshot._parse_router_intents(intents_path),
+        )
+
+    async def follow() -> None:
+        live = snapshot.AsyncSnapshot(spine_path, intents_path, poll_interval=0.01, json_backend="stdlib")
+        task = asyncio.ensure_future(live.run())
+        try:
+            version = 0
+            for chunk in spinechunks[1:]:
+                while live.entries() != expected():
+                    version, _ = await asyncio.wait_for(live.changes_since(version), 10)
+                with spine_path.open("ab") as handle:
+                    handle.write(chunk)
+            while live.entries() != expected():
+                version, _ = await asyncio.wait_for(live.changes_since(version), 10)
+            for output_mode in ("markdown", "html"):
+                assert live.render(output_mode, HEADER_TS) == snapshot._render_to_text(
+                    output_mode, HEADER_TS, expected()
+                )
+        finally:
+            task.cancel()
+
+    asyncio.run(follow())
+
+
+def test_async_snapshot_refolds_a_rewritten_spine(data: Dict[str, Path], tmp_path: Path) -> None:
+    spine_path = tmp_path / "spine.jsonl"
+    intents_path = tmp_path / "intents.jsonl"
+    lines = data["spine"].read_bytes().splitlines(keepends=True)
+    spine_path.write_bytes(b"".join(lines))
+    intents_path.write_bytes(data["intents"].read_bytes())
+
+    def expected() -> list[Dict[str, Any]]:
+        return entries(snapshot._parse_event_spine(spine_path), snapshot._parse_router_intents(intents_path))
+
+    async def follow() -> None:
+        live = snapshot.AsyncSnapshot(spine_path, intents_path, poll_interval=0.01, json_backend="stdlib")
+        task = asyncio.ensure_future(live.run())
+        try:
+            version, _ = await asyncio.wait_for(live.changes_since(0), 10)
+            assert live.entries() == expected()
+            # Rotated: a shorter file with other records; nothing of the old fold may survive.
+            spine_path.write_bytes(b"".join(lines[: len(lines) // 3][::-1]))
+            while live.entries() != expected():
+                version, _ = await asyncio.wait_for(live.changes_since(version), 10)
+        finally:
+            task.cancel()
+
+    asyncio.run(follow())
+
@@ -0,0 +1,148 @@
+"""follow: tailing appends, debouncing re-renders and refolding rewritten inputs."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+from support import chunks, snapshot
+
+
+def _regime_line(symbol: str, timestamp: str, regime: str) -> bytes:
+    payload = {"symbol": symbol, "regime": regime}
+    event = {"event_type": "market.regime", "timestamp": timestamp, "payload": payload}
+    return (json.dumps(event) + "\n").encode("utf-8")
+
+
+def _complete_prefix(path: Path, tmp_path: Path) -> Path:
+    # What a tail has consumed: everything up to the last newline.
+    reference = tmp_path / "reference.jsonl"
+    reference.write_bytes(path.read_bytes().rpartition(b"\n")[0] + b"\n")
+    return reference
+
+
+def _spine_tailer(path: Path) -> Any:
+    return snapshot._FoldTailer(path, lambda: snapshot._SpineFold())
+
+
+def test_tailer_consumes_completed_records(data: Dict[str, Path], tmp_path: Path) -> None:
+    path = tmp_path / "spine.jsonl"
+    path.write_bytes(b"")
+    tailer = _spine_tailer(path)
+    for chunk in chunks(data["spine"].read_bytes(), seed=5):
+        with path.open("ab") as handle:
+            handle.write(chunk)
+        assert tailer.poll() is not None
+        assert tailer.fold.summary() == snapshot._parse_event_spine(_complete_prefix(path, tmp_path))
+
+
+def test_tailer_refolds_after_truncation_in_place(data: Dict[str, Path], tmp_path: Path) -> None:
+    path = tmp_path / "spine.jsonl"
+    lines = data["spine"].read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines))
+    tailer = _spine_tailer(path)
+    tailer.poll()
+    # copytruncate: same inode, emptied, then written again.
+    with path.open("r+b") as handle:
+        handle.truncate(0)
+        handle.write(b"".join(lines[: len(lines) // 3]))
+    assert tailer.poll() is None
+    assert tailer.fold.summary() == snapshot._parse_event_spine(path)
+
+
+def test_truncation_during_a_poll_is_seen_by_the_next(
+    data: Dict[str, Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "spine.jsonl"
+    lines = data["spine"].read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines))
+    read_line_blocks = snapshot._read_line_blocks
+
+    def _truncating(handle: Any, limit: int | None = None) -> Iterator[bytes]:
+        blocks = read_line_blocks(handle, limit)
+        yield next(blocks)
+        with path.open("r+b") as writer:
+            writer.truncate(len(lines[0]) + len(lines[1]))
+        yield from blocks
+
+    monkeypatch.setattr(snapshot, "_MAP_BLOCK_BYTES", 4096)
+    monkeypatch.setattr(snapshot, "_read_line_blocks", _truncating)
+    tailer = _spine_tailer(path)
+    tailer.poll()
+    monkeypatch.setattr(snapshot, "_read_line_blocks", read_line_blocks)
+    assert tailer.poll() is None
+    assert tailer.fold.summary() == snapshot._parse_event_spine(path)
+
+
+class _Stop(Exception):
+    pass
+
+
+class _ScriptedWatcher:
+    """Stands in for the inotify/polling watcher: each wait() runs the next test step."""
+
+    def __init__(self, steps: list[Callable[[], None]]) -> None:
+        self.steps = iter(steps)
+
+    def wait(self, timeout: float) -> None:
+        step = next(self.steps, None)
+        if step is None:
+            raise _Stop
+        step()
+
+    def close(self) -> None:
+        pass
+
+
+def test_follow_debounces_bursts_and_refolds_rewrites(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    spine = tmp_path / "spine.jsonl"
+    start = "2025-12-22T00:00:00Z"
+    spine.write_bytes(_regime_line("AAA", start, "chop") + _regime_line("BBB", start, "chop"))
+    intents = tmp_path / "intents.jsonl"
+    intents.write_bytes(b"")
+    debounce = 0.3
+    writes: list[Dict[str, str]] = []
+
+    def _record(path: Path, text: str) -> None:
+        writes.append({entry["symbol"]: entry["regime"] for entry in json.loads(text)["entries"]})
+
+    def _append(line: bytes) -> Callable[[], None]:
+        def _step() -> None:
+            with spine.open("ab") as handle:
+                handle.write(line)
+
+        return _step
+
+    def _rewrite() -> None:
+        with spine.open("r+b") as handle:
+            handle.truncate(0)
+            handle.write(_regime_line("CCC", "2025-12-23T00:00:00Z", "trend_down"))
+
+    def _settle() -> None:
+        time.sleep(debounce + 0.05)
+
+    steps = [
+        _append(_regime_line("AAA", "2025-12-22T00:00:01Z", "breakout")),
+        _append(_regime_line("AAA", "2025-12-22T00:00:02Z", "trend_up")),
+        _append(_regime_line("BBB", "2025-12-22T00:00:03Z", "mean_revert")),
+        _settle,
+        _rewrite,
+        _settle,
+    ]
+    monkeypatch.setattr(snapshot, "_atomic_write_text", _record)
+    monkeypatch.setattr(snapshot, "_make_watcher", lambda *args: _ScriptedWatcher(steps))
+    live = snapshot._LiveSnapshot(spine, intents, None, False, "stdlib")
+    with pytest.raises(_Stop):
+        snapshot._follow(live, tmp_path / "out.json", "json", debounce, 0.05, True)
+    assert writes == [
+        {"AAA": "chop", "BBB": "chop"},
+        # Three changes inside one debounce window, one render.
+        {"AAA": "trend_up", "BBB": "mean_revert"},
+        # Truncated and rewritten in place: refolded, and the vanished symbols are dropped.
+        {"CCC": "trend_down"},
+    ]
@@ -0,0 +1,45 @@
+"""Every installed JSON backend folds exactly what the stdlib decoder folds."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from support import snapshot
+
+
+def test_json_backends_fold_identically(data: Dict[str, Path]) -> None:
+    reference = snapshot._parse_event_spine(data["spine"], json_backend="stdlib")
+    intents = snapshot._parse_router_intents(data["intents"], json_backend="stdlib")
+    for backend in snapshot._JSON_BACKENDS:
+        assert snapshot._parse_event_spine(data["spine"], json_backend=backend) == reference
+        assert snapshot._parse_router_intents(data["intents"], json_backend=backend) == intents
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["NaN", "Infinity", "-Infinity", "123456789012345678901234567890", "-9223372036854775809", '"\\udcff"'],
+)
+def test_values_fast_backends_refuse_are_decoded_by_the_stdlib(tmp_path: Path, value: str) -> None:
+    # Fast backends refuse these, or (orjson) widen the integers to floats; either way the
+    # record must fold and render as json.loads reads it. NaN != NaN, so compare reprs.
+    spine = tmp_path / "spine.jsonl"
+    spine.write_text(
+        '{"event_type": "market.regime", "timestamp": "2025-12-22T00:00:00Z",'
+        ' "payload": {"symbol": "X", "regime": "old"}}\n'
+        '{"event_type": "market.regime", "timestamp": "2025-12-22T00:00:05Z",'
+        f' "payload": {{"symbol": "X", "regime": "new", "confidence": {value}}}}}\n',
+        encoding="utf-8",
+    )
+    intents = tmp_path / "intents.jsonl"
+    intents.write_text(
+        f'{{"timestamp": "2025-12-22T00:00:05Z", "symbol": "X", "payload": {{"size_pct": {value}}}}}\n',
+        encoding="utf-8",
+    )
+    reference_spine = snapshot._parse_event_spine(spine, json_backend="stdlib")
+    reference_intents = snapshot._parse_router_intents(intents, json_backend="stdlib")
+    assert reference_spine["X"]["market.regime"].regime == "new" and "X" in reference_intents
+    for backend in snapshot._JSON_BACKENDS:
+        assert repr(snapshot._parse_event_spine(spine, json_backend=backend)) == repr(reference_spine)
+        assert repr(snapshot._parse_router_intents(intents, json_backend=backend)) == repr(reference_intents)
@@ -0,0 +1,29 @@
+"""Buffered rendering: byte for byte what the per-line print() renderers wrote."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import bench_render
+import pytest
+from support import snapshot
+
+
+def _entries() -> list[Dict[str, Any]]:
+    entries = bench_render.synthetic_entries(50)
+    entries[0]["rationale"] = []
+    entries[1]["rationale"] = "not a list"
+    entries[2]["symbol"] = "A&B<\"'>"
+    entries[3]["rationale"] = ["naïve — ünïcode", " line separator"]
+    entries[4]["risk_cap"] = None
+    return entries
+
+
+@pytest.mark.parametrize("output_mode", ["terminal", "markdown", "html"])
+def test_buffered_render_matches_the_per_line_reference(output_mode: str) -> None:
+    entries = _entries()
+    header_ts = "2025-12-22T00:00:00Z"
+    reference = bench_render.REFERENCES[output_mode]
+    expected = bench_render.captured(lambda: reference(header_ts, entries))
+    assert bench_render.captured(lambda: snapshot._render(output_mode, header_ts, entries)) == expected
+    assert snapshot._render_to_text(output_mode, header_ts, entries).encode("utf-8") == expected
@@ -0,0 +1,111 @@
+"""The byte scanners: mapped, block-read and reversed scans all fold the same records."""
+
+from __future__ import annotations
+
+import errno
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from support import generate_dataset, snapshot
+
+
+def _feed_fifo(path: Path, data: bytes) -> threading.Thread:
+    os.mkfifo(path)
+
+    def _write() -> None:
+        with path.open("wb") as handle:
+            handle.write(data)
+
+    writer = threading.Thread(target=_write, daemon=True)
+    writer.start()
+    return writer
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"checkpoint_path": "checkpoint.json"}, {"workers": 3}, {"reverse_symbols": ["SYM00001"]}],
+)
+def test_fifo_spine_matches_regular_file(
+    data: Dict[str, Path], tmp_path: Path, options: Dict[str, Any]
+) -> None:
+    # e.g. <(zcat spine.jsonl.gz): no size, no seeking, one pass.
+    if "checkpoint_path" in options:
+        options = {"checkpoint_path": tmp_path / options["checkpoint_path"]}
+    expected_counts: Counter = Counter()
+    expected = snapshot._parse_event_spine(data["spine"], counts=expected_counts)
+    writer = _feed_fifo(tmp_path / "spine.fifo", data["spine"].read_bytes())
+    counts: Counter = Counter()
+    assert snapshot._parse_event_spine(tmp_path / "spine.fifo", counts=counts, **options) == expected
+    writer.join(5)
+    assert not writer.is_alive()
+    for name in ("bytes_read", "lines_read", "lines_fed", "records_folded"):
+        assert counts[name] == expected_counts[name]
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+def test_fifo_intents_match_regular_file(data: Dict[str, Path], tmp_path: Path) -> None:
+    writer = _feed_fifo(tmp_path / "intents.fifo", data["intents"].read_bytes())
+    parsed = snapshot._parse_router_intents(tmp_path / "intents.fifo", checkpoint_path=tmp_path / "ck")
+    assert parsed == snapshot._parse_router_intents(data["intents"])
+    writer.join(5)
+
+
+def test_block_reads_split_records_like_the_mapping(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(snapshot, "_MAP_BLOCK_BYTES", 7)
+    for text in (b"", b"\n", b"a", b"a\n", b"a\n\nbb\n", b"a\nmarket.regime x\nccc", b"\n\n\n" + b"x" * 30):
+        path = tmp_path / "lines"
+        path.write_bytes(text)
+        for literal in (None, b"market.regime"):
+            with path.open("rb") as handle:
+                mapped = list(snapshot._iter_file_lines(handle, literal, None))
+            with path.open("rb") as handle:
+                read = list(snapshot._iter_read_lines(handle, literal, None))
+            assert read == mapped
+
+
+def test_unmappable_filesystem_falls_back_to_reads(
+    data: Dict[str, Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    expected_spine = snapshot._parse_event_spine(data["spine"])
+    expected_intents = snapshot._parse_router_intents(data["intents"])
+
+    def _refuse(*args: Any, **kwargs: Any) -> None:
+        raise OSError(errno.ENODEV, "No such device")
+
+    monkeypatch.setattr(snapshot.mmap, "mmap", _refuse)
+    for options in (
+        {},
+        {"checkpoint_path": tmp_path / "checkpoint.json"},
+        {"symbol_index_path": tmp_path / "index.json"},
+        {"as_of": "2030-01-01T00:00:00Z", "time_index_path": tmp_path / "time-index.json"},
+    ):
+        assert snapshot._parse_event_spine(data["spine"], **options) == expected_spine
+    intents = snapshot._parse_router_intents(data["intents"], checkpoint_path=tmp_path / "intents.json")
+    assert intents == expected_intents
+
+
+def test_reverse_scan_matches_full_fold(tmp_path: Path) -> None:
+    # Early stopping is only exact for spines appended in timestamp order.
+    ordered = generate_dataset(tmp_path, disorder=0.0)
+    wanted = ["SYM00001", "SYM00100", "SYM00150"]
+    full = snapshot._parse_event_spine(ordered["spine"])
+    reversed_summary = snapshot._parse_event_spine(ordered["spine"], reverse_symbols=wanted)
+    assert {symbol: reversed_summary.get(symbol) for symbol in wanted} == {
+        symbol: full.get(symbol) for symbol in wanted
+    }
+
+
+def test_parallel_fold_matches_serial(data: Dict[str, Path], monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(snapshot, "_MIN_RANGE_BYTES", 64 << 10)
+    for strict in (False, True):
+        serial_counts: Counter = Counter()
+        serial = snapshot._parse_event_spine(data["spine"], strict=strict, counts=serial_counts)
+        counts: Counter = Counter()
+        assert snapshot._parse_event_spine(data["spine"], strict=strict, workers=3, counts=counts) == serial
+        serial_counts.pop("decode_ns", None)
+        counts.pop("decode_ns", None)
+        assert counts == serial_counts
@@ -0,0 +1,262 @@
+"""serve: conditional and compressed responses, and refreshes that survive input errors."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+from support import ROOT, snapshot
+
+_SCRIPT = ROOT / "snapshot" / "synthdesk_snapshot.py"
+
+
+def _regime_line(symbol: str, timestamp: str, regime: str) -> str:
+    payload = {"symbol": symbol, "regime": regime}
+    return json.dumps({"event_type": "market.regime", "timestamp": timestamp, "payload": payload}) + "\n"
+
+
+def _get(url: str, **headers: str) -> tuple[int, Dict[str, str], bytes]:
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def _wait_for(check: Callable[[], Any], timeout: float = 10.0) -> Any:
+    deadline = time.monotonic() + timeout
+    while True:
+        result = check()
+        if result or time.monotonic() > deadline:
+            return result
+        time.sleep(0.05)
+
+
+class _Server:
+    def __init__(self, spine: Path, intents: Path) -> None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        command = [sys.executable, str(_SCRIPT), "serve", str(spine), str(intents), "--port", str(port)]
+        command += ["--poll", "--poll-interval", "0.05", "--coalesce", "0"]
+        self.process = subprocess.Popen(command, stderr=subprocess.PIPE)
+
+        def _up() -> bool:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            except OSError:
+                return False
+            return True
+
+        assert _wait_for(_up), "serve did not start"
+
+    def symbols(self) -> Dict[str, str]:
+        _, _, body = _get(self.url + "/snapshot.json")
+        return {entry["symbol"]: entry["regime"] for entry in json.loads(body)["entries"]}
+
+    def events(self, count: int, since: str | None = None, last_event_id: str | None = None) -> list[Any]:
+        """The first `count` SSE events (as (id, data) pairs) of an /events stream."""
+        url = self.url + "/events" + ("" if since is None else f"?since={since}")
+        headers = {} if last_event_id is None else {"Last-Event-ID": last_event_id}
+        received: list[Any] = []
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as stream:
+            event_id = None
+            while len(received) < count:
+                line = stream.readline().decode("utf-8").rstrip("\n")
+                if line.startswith("id: "):
+                    event_id = line[4:]
+                elif line.startswith("data: "):
+                    received.append((event_id, json.loads(line[6:])))
+        return received
+
+    def page_event_id(self) -> str:
+        _, _, body = _get(self.url + "/")
+        return re.search(r"/events\?since=([^\"]*)", body.decode("utf-8")).group(1)
+
+    def stop(self) -> str:
+        self.process.terminate()
+        _, stderr = self.process.communicate(timeout=10)
+        return stderr.decode("utf-8", "replace")
+
+
+@pytest.fixture
+def inputs(tmp_path: Path) -> Dict[str, Path]:
+    spine = tmp_path / "spine.jsonl"
+    spine.write_text(_regime_line("AAA", "2025-12-22T00:00:00Z", "chop"), encoding="utf-8")
+    intents = tmp_path / "intents.jsonl"
+    intents.write_text("", encoding="utf-8")
+    return {"spine": spine, "intents": intents}
+
+
+@pytest.fixture
+def server(inputs: Dict[str, Path]) -> Iterator[_Server]:
+    running = _Server(inputs["spine"], inputs["intents"])
+    yield running
+    running.stop()
+
+
+def test_etag_revalidation_and_gzip(server: _Server, inputs: Dict[str, Path]) -> None:
+    status, headers, body = _get(server.url + "/")
+    assert status == 200 and b"AAA" in body
+    etag = headers["ETag"]
+    status, headers, _ = _get(server.url + "/", **{"If-None-Match": etag})
+    assert (status, headers["ETag"]) == (304, etag)
+
+    status, headers, compressed = _get(server.url + "/", **{"Accept-Encoding": "gzip"})
+    assert headers["Content-Encoding"] == "gzip" and gzip.decompress(compressed) == body
+    assert headers["ETag"] != etag
+    # The identity validator must not revalidate the gzip representation, nor the other way round.
+    assert _get(server.url + "/", **{"Accept-Encoding": "gzip", "If-None-Match": etag})[0] == 200
+    assert _get(server.url + "/", **{"If-None-Match": headers["ETag"]})[0] == 200
+    assert _get(server.url + "/", **{"Accept-Encoding": "gzip;q=0"})[1].get("Content-Encoding") is None
+
+    with inputs["spine"].open("a", encoding="utf-8") as handle:
+        handle.write(_regime_line("AAA", "2025-12-22T00:00:01Z", "breakout"))
+    assert _wait_for(lambda: server.symbols() == {"AAA": "breakout"})
+    status, headers, _ = _get(server.url + "/", **{"If-None-Match": etag})
+    assert status == 200 and headers["ETag"] != etag
+
+
+def test_refresh_errors_keep_the_server_polling(server: _Server, inputs: Dict[str, Path]) -> None:
+    # A rotation that briefly leaves a directory at the input path.
+    spine = inputs["spine"]
+    original = spine.read_text(encoding="utf-8")
+    spine.unlink()
+    spine.mkdir()
+    time.sleep(0.5)
+    assert server.symbols() == {"AAA": "chop"}
+    shutil.rmtree(spine)
+    spine.write_text(original + _regime_line("BBB", "2025-12-22T00:00:01Z", "trend_up"), encoding="utf-8")
+    assert _wait_for(lambda: server.symbols() == {"AAA": "chop", "BBB": "trend_up"})
+    assert server.process.poll() is None
+    stderr = server.stop()
+    assert stderr.count("refreshing the snapshot failed") == 1
+    assert "recovered" in stderr
+
+
+def test_events_resume_from_the_page_version(server: _Server, inputs: Dict[str, Path]) -> None:
+    since = server.page_event_id()
+    with inputs["spine"].open("a", encoding="utf-8") as handle:
+        handle.write(_regime_line("BBB", "2025-12-22T00:00:01Z", "trend_up"))
+    # Only the change after the page's version is sent, tagged with the next version.
+    [(event_id, update)] = server.events(1, since=since)
+    assert update["symbol"] == "BBB" and update["entry"]["regime"] == "trend_up"
+    epoch, version = since.rsplit("-", 1)
+    assert event_id == f"{epoch}-{int(version) + 1}"
+    assert server.events(1, last_event_id=since)[0][1]["symbol"] == "BBB"
+
+
+@pytest.mark.parametrize("stale", ["0-1", "1", "-", "²", "abc-²", "{epoch}-999"])
+def test_events_from_another_process_resend_every_entry(
+    server: _Server, inputs: Dict[str, Path], stale: str
+) -> None:
+    with inputs["spine"].open("a", encoding="utf-8") as handle:
+        handle.write(_regime_line("BBB", "2025-12-22T00:00:01Z", "trend_up"))
+    assert _wait_for(lambda: len(server.symbols()) == 2)
+    stale = stale.format(epoch=server.page_event_id().rsplit("-", 1)[0])
+    updates = [update for _, update in server.events(2, last_event_id=stale)]
+    assert sorted(update["symbol"] for update in updates) == ["AAA", "BBB"]
+
+
+def test_events_after_a_restart_resend_every_entry(inputs: Dict[str, Path]) -> None:
+    # The page came from a previous process that had reached version 1; the new
+    # one gets past version 1 before the client reconnects.
+    first = _Server(inputs["spine"], inputs["intents"])
+    since = first.page_event_id()
+    first.stop()
+    with inputs["spine"].open("a", encoding="utf-8") as handle:
+        handle.write(_regime_line("AAA", "2025-12-22T00:00:01Z", "breakout"))
+    second = _Server(inputs["spine"], inputs["intents"])
+    try:
+        with inputs["spine"].open("a", encoding="utf-8") as handle:
+            handle.write(_regime_line("BBB", "2025-12-22T00:00:02Z", "trend_up"))
+        assert _wait_for(lambda: len(second.symbols()) == 2)
+        updates = {update["symbol"]: update["entry"]["regime"] for _, update in second.events(2, since=since)}
+        assert updates == {"AAA": "breakout", "BBB": "trend_up"}
+    finally:
+        second.stop()
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", False),
+        ("gzip", True),
+        ("GZIP, deflate", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0, *", False),
+        ("deflate, *", True),
+        ("*;q=0", False),
+        ("gzip;q=0.5", True),
+        ("gzip;q=bogus", False),
+        ("br, identity", False),
+    ],
+)
+def test_accepts_gzip(header: str, expected: bool) -> None:
+    assert snapshot._accepts_gzip(header) is expected
+
+
+def _publisher(inputs: Dict[str, Path]) -> Any:
+    live = snapshot._LiveSnapshot(inputs["spine"], inputs["intents"], None, False, "stdlib")
+    publisher = snapshot._SnapshotPublisher(live)
+    publisher.refresh()
+    return publisher
+
+
+def test_requests_are_served_while_a_refresh_folds(inputs: Dict[str, Path]) -> None:
+    publisher = _publisher(inputs)
+    served = publisher.body("json")
+    folding = threading.Event()
+    release = threading.Event()
+    poll = publisher.live.poll
+
+    def _slow_poll() -> set[str]:
+        folding.set()
+        release.wait(10)
+        return poll()
+
+    publisher.live.poll = _slow_poll
+    with inputs["spine"].open("a", encoding="utf-8") as handle:
+        handle.write(_regime_line("AAA", "2025-12-22T00:00:01Z", "breakout"))
+    refresher = threading.Thread(target=publisher.refresh)
+    refresher.start()
+    try:
+        assert folding.wait(10)
+        # Revalidations and /events bookkeeping must not wait for the fold.
+        answered = []
+        reader = threading.Thread(target=lambda: answered.append(publisher.body("json")), daemon=True)
+        reader.start()
+        reader.join(2)
+        assert answered == [served]
+    finally:
+        release.set()
+        refresher.join(10)
+    assert publisher.body("json") != served
+
+
+def test_etag_tracks_the_body_not_only_the_entries(inputs: Dict[str, Path]) -> None:
+    # chop -> breakout -> chop: the entries repeat, but the page's header and its
+    # /events version do not, so neither may the strong validator.
+    publisher = _publisher(inputs)
+    etag, body, _ = publisher.body("html")
+    for second, regime in ((1, "breakout"), (2, "chop")):
+        with inputs["spine"].open("a", encoding="utf-8") as handle:
+            handle.write(_regime_line("AAA", f"2025-12-22T00:00:0{second}Z", regime))
+        publisher.refresh()
+    later_etag, later_body, _ = publisher.body("html")
+    assert publisher.entries_by_symbol["AAA"]["regime"] == "chop"
+    assert later_body != body and later_etag != etag
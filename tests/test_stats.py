@@ -0,0 +1,130 @@
+"""--stats and --metrics-file: every line read is accounted for once, and exported as OpenMetrics."""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+from support import run_cli, snapshot
+
+
+def _report(tmp_path: Path, data: Dict[str, Path], *args: Any) -> Dict[str, Any]:
+    stats_file = tmp_path / "stats.json"
+    run_cli(data["spine"], data["intents"], "json", "--stats-file", stats_file, *args)
+    return json.loads(stats_file.read_text(encoding="utf-8"))
+
+
+def _file_lines(path: Path) -> int:
+    content = path.read_bytes()
+    return content.count(b"\n") + (0 if content.endswith(b"\n") else 1)
+
+
+@pytest.mark.parametrize(
+    "args", [(), ("--strict",), ("--workers", "2"), ("--reverse", "--symbols", "SYM00001")]
+)
+def test_every_line_read_is_folded_or_rejected_once(
+    data: Dict[str, Path], tmp_path: Path, args: tuple[str, ...]
+) -> None:
+    report = _report(tmp_path, data, *args)
+    assert set(report["phases"]) >= {"parse_spine", "parse_intents", "build_entries", "render"}
+    for name, counts in report["inputs"].items():
+        rejected = sum(count for key, count in counts.items() if key.startswith("rejected_"))
+        assert counts["lines_read"] == counts["records_folded"] + rejected
+        if "--reverse" not in args:
+            assert counts["bytes_read"] == data[name].stat().st_size
+            assert counts["lines_read"] == _file_lines(data[name])
+
+
+def test_prefiltered_lines_are_one_count_and_strict_splits_them(
+    data: Dict[str, Path], tmp_path: Path
+) -> None:
+    spine = _report(tmp_path, data)["inputs"]["spine"]
+    strict = _report(tmp_path, data, "--strict")["inputs"]["spine"]
+    assert spine["rejected_prefilter"] == spine["lines_read"] - spine["lines_fed"] > 0
+    assert "rejected_prefilter" not in strict and strict["lines_fed"] == strict["lines_read"]
+    # Ticks are valid JSON of another event type; garbage and blank lines have reasons of their own.
+    assert strict["rejected_event_type"] > 0 and strict["rejected_blank"] > 0
+    assert strict["records_folded"] == spine["records_folded"]
+    rejected = sum(count for key, count in spine.items() if key.startswith("rejected_"))
+    assert sum(count for key, count in strict.items() if key.startswith("rejected_")) == rejected
+
+
+def test_symbol_index_counts_only_appended_lines(data: Dict[str, Path], tmp_path: Path) -> None:
+    plain = _report(tmp_path, data)["inputs"]["spine"]
+    plain.pop("decode_seconds")
+    index = tmp_path / "index.json"
+    built = _report(tmp_path, data, "--symbol-index", index)["inputs"]["spine"]
+    built.pop("decode_seconds")
+    assert built == plain
+    # Nothing was appended, so the second run resumes from the index without reading a line.
+    resumed = _report(tmp_path, data, "--symbol-index", index)["inputs"]["spine"]
+    assert resumed.get("lines_read", 0) == resumed.get("bytes_read", 0) == 0
+
+
+_SAMPLE = re.compile(r'([a-z_]+)(?:\{((?:[a-z_]+="(?:[^"\\]|\\.)*",?)*)\})? (\S+)')
+
+
+def _parse_openmetrics(text: str) -> Dict[str, Dict[str, Any]]:
+    # Just enough of the OpenMetrics text format to check the layout this tool writes.
+    assert text.endswith("\n# EOF\n")
+    families: Dict[str, Dict[str, Any]] = {}
+    for line in text.splitlines()[:-1]:
+        if line.startswith("# "):
+            _, keyword, name, value = line.split(" ", 3)
+            family = families.setdefault(name, {"samples": {}})
+            assert keyword in ("TYPE", "UNIT", "HELP") and keyword not in family and not family["samples"]
+            family[keyword] = value
+            continue
+        match = _SAMPLE.fullmatch(line)
+        assert match is not None, line
+        name, labels, value = match.groups()
+        family = families[name]
+        assert family["TYPE"] == "gauge" and "HELP" in family
+        assert "UNIT" not in family or name.endswith("_" + family["UNIT"])
+        key = tuple(re.findall(r'([a-z_]+)="((?:[^"\\]|\\.)*)"', labels or ""))
+        assert key not in family["samples"]
+        family["samples"][key] = float(value)
+    return families
+
+
+def test_metrics_file_is_openmetrics(data: Dict[str, Path], tmp_path: Path) -> None:
+    spine = tmp_path / "spine.jsonl"
+    # A symbol that needs label escaping.
+    spine.write_bytes(
+        data["spine"].read_bytes()
+        + b'{"event_type": "market.regime", "timestamp": "2025-12-22T00:00:00Z",'
+        b' "payload": {"symbol": "A\\"B\\\\C", "regime": "chop"}}\n'
+    )
+    metrics_file = tmp_path / "metrics.prom"
+    before = time.time()
+    run_cli(spine, data["intents"], "json", "--metrics-file", metrics_file)
+    families = _parse_openmetrics(metrics_file.read_text(encoding="utf-8"))
+    rendered = families["synthdesk_snapshot_render_timestamp_seconds"]["samples"][()]
+    assert before <= rendered <= time.time()
+    spine_summary = snapshot._parse_event_spine(spine)
+    intent_summary = snapshot._parse_router_intents(data["intents"])
+    symbols = snapshot._select_symbols(spine_summary, intent_summary, None)
+    assert families["synthdesk_snapshot_symbols"]["samples"][()] == len(symbols)
+    expected = {}
+    for symbol in symbols:
+        records = dict(spine_summary.get(symbol, {}))
+        if symbol in intent_summary:
+            records["intent"] = intent_summary[symbol]
+        for record_type, record in records.items():
+            label = symbol.replace("\\", "\\\\").replace('"', '\\"')
+            expected[(("symbol", label), ("record", record_type))] = record.ts_key / 1e9
+    timestamps = families["synthdesk_snapshot_record_timestamp_seconds"]["samples"]
+    ages = families["synthdesk_snapshot_record_age_seconds"]["samples"]
+    assert timestamps == pytest.approx(expected, abs=1e-6)
+    assert {key: rendered - ages[key] for key in ages} == pytest.approx(expected, abs=1e-5)
+    assert (("symbol", 'A\\"B\\\\C'), ("record", "market.regime")) in timestamps
+    assert families["synthdesk_snapshot_read_bytes"]["samples"] == {
+        (("input", "spine"),): spine.stat().st_size,
+        (("input", "intents"),): data["intents"].stat().st_size,
+    }
+    phases = families["synthdesk_snapshot_phase_duration_seconds"]["samples"]
+    assert {name for ((_, name),) in phases} >= {"parse_spine", "parse_intents", "build_entries", "render"}
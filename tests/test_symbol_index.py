@@ -0,0 +1,35 @@
+"""The sidecar symbol index: indexed and subset folds equal the full fold as the spine grows."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+from support import chunks, snapshot
+
+
+def test_symbol_index_matches_full_fold(data: Dict[str, Path], tmp_path: Path) -> None:
+    path = tmp_path / "spine.jsonl"
+    path.write_bytes(b"")
+    wanted = ["SYM00003", "SYM00042", "SYM00199", "MISSING"]
+    for chunk in chunks(data["spine"].read_bytes(), seed=2):
+        with path.open("ab") as handle:
+            handle.write(chunk)
+        full = snapshot._parse_event_spine(path)
+        indexed = snapshot._parse_event_spine(path, symbol_index_path=tmp_path / "index.json")
+        assert indexed == full
+        subset = snapshot._parse_event_spine(
+            path, symbol_index_path=tmp_path / "index.json", index_symbols=wanted
+        )
+        assert subset == {symbol: entry for symbol, entry in full.items() if symbol in wanted}
+
+
+def test_rewritten_spine_rebuilds_the_index(data: Dict[str, Path], tmp_path: Path) -> None:
+    path = tmp_path / "spine.jsonl"
+    lines = data["spine"].read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines[: len(lines) // 2]))
+    snapshot._parse_event_spine(path, symbol_index_path=tmp_path / "index.json")
+    # Same size, different records: offsets from the old index would point mid-record.
+    path.write_bytes(b"".join(reversed(lines[: len(lines) // 2])))
+    indexed = snapshot._parse_event_spine(path, symbol_index_path=tmp_path / "index.json")
+    assert indexed == snapshot._parse_event_spine(path)
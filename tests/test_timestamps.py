@@ -0,0 +1,121 @@
+"""_ts_key: the integer key every "latest wins" comparison uses."""
+
+from __future__ import annotations
+
+import json
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from support import snapshot
+
+KEY = 1766397600 * 1_000_000_000  # 2025-12-22T10:00:00Z
+
+
+@pytest.mark.parametrize(
+    "layout",
+    [
+        "2025-12-22T10:00:00Z",
+        "2025-12-22T10:00:00+00:00",
+        "2025-12-22T10:00Z",
+        "2025-12-22T10+00:00",
+        "2025-12-22T10:00:00.000Z",
+        "20251222T100000Z",
+        "20251222T1000+00:00",
+        "20251222T10Z",
+        "20251222T100000,000000000000Z",
+    ],
+)
+def test_equivalent_layouts_share_a_key(layout: str) -> None:
+    assert snapshot._ts_key(layout) == KEY
+
+
+def test_fractions_keep_nanoseconds_in_every_layout() -> None:
+    # The in-place parser and the other layouts agree, and neither stops at microseconds.
+    expected = KEY + 123_456_789
+    for stamp in (
+        "2025-12-22T10:00:00.123456789Z",
+        "2025-12-22T10:00:00.1234567891+00:00",
+        "2025-12-22T10:00:00,123456789Z",
+        "20251222T100000.123456789Z",
+    ):
+        assert snapshot._ts_key(stamp) == expected
+    assert snapshot._ts_key("2025-12-22T10:00:00,5Z") == snapshot._ts_key("2025-12-22T10:00:00.5Z")
+
+
+@pytest.mark.parametrize(
+    "invalid",
+    [
+        None,
+        1766397600,
+        "yesterday",
+        "2025-12-22T10:00:00+01:00",
+        "2025-12-22 10:00:00Z",
+        "2025-12-22T10:00:0Z",
+        "2025-12-22T10:00:00.Z",
+        "2025-12-22T10:00:60Z",
+        "2025-02-30T10:00:00Z",
+        "2025-12-22T10:00:00.٥Z",  # a non-ASCII digit
+        "２025-12-22T10:00:00Z",
+        "2025-12-22T1000Z",  # extended date with a basic time
+        "2025-W52-1T10:00:00Z",
+        "2025-356T10:00:00Z",
+    ],
+)
+def test_other_strings_have_no_key(invalid: object) -> None:
+    assert snapshot._ts_key(invalid) is None
+
+
+def _stamp(rng: random.Random) -> str:
+    # Few distinct seconds, so equal-length fractions with either separator meet often.
+    minutes, seconds = divmod(rng.randrange(90), 60)
+    fraction = rng.choice(["", ".1", ",9", ".25", ",75", ".123456789"])
+    if rng.random() < 0.5:
+        stamp = f"2025-12-22T10:{minutes:02d}:{seconds:02d}{fraction}"
+    else:
+        stamp = f"20251222T10{minutes:02d}{seconds:02d}{fraction}"
+    if rng.random() < 0.05:
+        stamp = stamp.replace("2025-12-22", "2025-11-31").replace("20251222", "20251131")
+    return stamp + rng.choice(["Z", "+00:00"])
+
+
+def test_string_order_shortcut_keeps_the_fold_result(tmp_path: Path) -> None:
+    # Without counts, a record older than the current one in the same layout is dropped
+    # unparsed; the counted fold parses every stamp, and both must keep the same records.
+    rng = random.Random(5)
+    spine, intents = [], []
+    for _ in range(3000):
+        stamp = _stamp(rng)
+        symbol = f"S{rng.randrange(5)}"
+        payload = {"symbol": symbol, "regime": stamp}
+        spine.append({"event_type": "market.regime", "timestamp": stamp, "payload": payload})
+        intents.append({"timestamp": stamp, "symbol": symbol, "payload": {"direction": stamp}})
+    for name, records, parse in (
+        ("spine", spine, snapshot._parse_event_spine),
+        ("intents", intents, snapshot._parse_router_intents),
+    ):
+        path = tmp_path / f"{name}.jsonl"
+        path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+        assert parse(path) == parse(path, counts=Counter())
+
+
+@pytest.mark.parametrize(
+    "older, newer",
+    [
+        ("2025-12-22T10:00:00.1Z", "2025-12-22T10:00:00,9Z"),  # "," sorts before "."
+        ("20251222T100000.123Z", "2025-12-22T10:00:01Z"),  # basic sorts after extended
+        ("20251222T11+00:00", "2025-12-22T12:00Z"),
+    ],
+)
+def test_string_order_shortcut_needs_one_layout(tmp_path: Path, older: str, newer: str) -> None:
+    assert len(older) == len(newer) and newer < older
+    path = tmp_path / "intents.jsonl"
+    path.write_text(
+        "".join(
+            json.dumps({"timestamp": stamp, "symbol": "S", "payload": {"direction": "long"}}) + "\n"
+            for stamp in (older, newer)
+        ),
+        encoding="utf-8",
+    )
+    assert snapshot._parse_router_intents(path)["S"].timestamp == newer